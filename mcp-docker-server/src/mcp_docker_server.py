@@ -1,6 +1,11 @@
-import json
+import asyncio
+import time
+
+import orjson
 import docker
-from http.server import BaseHTTPRequestHandler, HTTPServer
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse
 
 # Start-up message
 print("Starting MCP server...")
@@ -14,153 +19,203 @@ except Exception as e:
     print(f"Error connecting to Docker: {e}")
     exit(1)
 
-# Define the HTTP request handler
-class MCPDockerHandler(BaseHTTPRequestHandler):
-    def do_POST(self):
-        # Read the incoming POST request
-        content_length = int(self.headers['Content-Length'])
-        post_data = self.rfile.read(content_length)
-        request = json.loads(post_data)
-        command = request.get('command')
-        print(f"Received command: {command}")
-
-        # Handle different Docker commands
-        if command == 'list_containers':
-            containers = [c.name for c in client.containers.list()]
-            response = {'result': containers}
-            status = 200
-        elif command == 'get_container_status':
-            container_id = request.get('container_id')
-            if container_id:
-                try:
-                    container = client.containers.get(container_id)
-                    response = {'result': {'status': container.status, 'image': container.image.tags}}
-                    status = 200
-                except docker.errors.NotFound:
-                    response = {'error': 'Container not found'}
-                    status = 404
-                except Exception as e:
-                    response = {'error': str(e)}
-                    status = 500
-            else:
-                response = {'error': 'Container ID not provided'}
-                status = 400
-        elif command == 'start_container':
-            container_id = request.get('container_id')
-            if container_id:
-                try:
-                    container = client.containers.get(container_id)
-                    container.start()
-                    response = {'result': f'Container {container_id} started'}
-                    status = 200
-                except docker.errors.NotFound:
-                    response = {'error': 'Container not found'}
-                    status = 404
-                except Exception as e:
-                    response = {'error': str(e)}
-                    status = 500
-            else:
-                response = {'error': 'Container ID not provided'}
-                status = 400
-        elif command == 'stop_container':
-            container_id = request.get('container_id')
-            if container_id:
-                try:
-                    container = client.containers.get(container_id)
-                    container.stop()
-                    response = {'result': f'Container {container_id} stopped'}
-                    status = 200
-                except docker.errors.NotFound:
-                    response = {'error': 'Container not found'}
-                    status = 404
-                except Exception as e:
-                    response = {'error': str(e)}
-                    status = 500
-            else:
-                response = {'error': 'Container ID not provided'}
-                status = 400
-        elif command == 'remove_container':
-            container_id = request.get('container_id')
-            if container_id:
-                try:
-                    container = client.containers.get(container_id)
-                    container.remove()
-                    response = {'result': f'Container {container_id} removed'}
-                    status = 200
-                except docker.errors.NotFound:
-                    response = {'error': 'Container not found'}
-                    status = 404
-                except Exception as e:
-                    response = {'error': str(e)}
-                    status = 500
-            else:
-                response = {'error': 'Container ID not provided'}
-                status = 400
-        elif command == 'list_images':
-            images = [img.tags[0] if img.tags else img.id for img in client.images.list()]
-            response = {'result': images}
-            status = 200
-        elif command == 'pull_image':
-            image_name = request.get('image_name')
-            if image_name:
-                try:
-                    client.images.pull(image_name)
-                    response = {'result': f'Image {image_name} pulled successfully'}
-                    status = 200
-                except Exception as e:
-                    response = {'error': str(e)}
-                    status = 500
-            else:
-                response = {'error': 'Image name not provided'}
-                status = 400
-        elif command == 'run_container':
-            image_name = request.get('image_name')
-            container_name = request.get('container_name', None)
-            if image_name:
-                try:
-                    container = client.containers.run(image_name, name=container_name, detach=True)
-                    response = {'result': f'Container {container.name} started from image {image_name}'}
-                    status = 200
-                except Exception as e:
-                    response = {'error': str(e)}
-                    status = 500
-            else:
-                response = {'error': 'Image name not provided'}
-                status = 400
-        elif command == 'get_container_logs':
-            container_id = request.get('container_id')
-            if container_id:
-                try:
-                    container = client.containers.get(container_id)
-                    logs = container.logs().decode('utf-8')
-                    response = {'result': logs}
-                    status = 200
-                except docker.errors.NotFound:
-                    response = {'error': 'Container not found'}
-                    status = 404
-                except Exception as e:
-                    response = {'error': str(e)}
-                    status = 500
-            else:
-                response = {'error': 'Container ID not provided'}
-                status = 400
-        else:
-            response = {'error': 'Unknown command'}
-            status = 400
-
-        # Send the response back to the client
-        self.send_response(status)
-        self.send_header('Content-type', 'application/json')
-        self.end_headers()
-        self.wfile.write(json.dumps(response).encode())
+# FastAPI app; ORJSONResponse keeps response serialization on orjson
+app = FastAPI(default_response_class=ORJSONResponse)
+
+# Short-lived cache of container inspect results so repeated status
+# queries don't hammer the daemon (entries live for one second)
+_INSPECT_TTL = 1.0
+_inspect_cache = {}
+
+# Sweep a cache of expired entries once it grows past this many keys,
+# so hosts churning through distinct containers/images (e.g. CI) don't
+# accumulate dead tuples for the life of the server
+_CACHE_SWEEP_AT = 256
+
+
+def _cache_get(cache, key):
+    """Return a live cached value, evicting the entry if it expired."""
+    cached = cache.get(key)
+    if not cached:
+        return None
+    if cached[0] <= time.monotonic():
+        del cache[key]
+        return None
+    return cached[1]
+
+
+def _cache_put(cache, key, value, ttl):
+    """Store a value with a TTL, sweeping expired entries when large."""
+    now = time.monotonic()
+    if len(cache) >= _CACHE_SWEEP_AT:
+        for stale in [k for k, (expires, _) in cache.items() if expires <= now]:
+            del cache[stale]
+    cache[key] = (now + ttl, value)
+    return value
+
+
+def inspect_container(container_id):
+    """Inspect a container, caching the result for a short TTL."""
+    info = _cache_get(_inspect_cache, container_id)
+    if info is not None:
+        return info
+    info = client.api.inspect_container(container_id)
+    return _cache_put(_inspect_cache, container_id, info, _INSPECT_TTL)
+
+
+# Image tags change rarely, so they get their own longer-lived cache
+# keyed by image id
+_IMAGE_TTL = 60.0
+_image_tags_cache = {}
+
+
+def image_tags(image_id):
+    """Look up an image's repo tags, caching the result."""
+    tags = _cache_get(_image_tags_cache, image_id)
+    if tags is not None:
+        return tags
+    tags = client.api.inspect_image(image_id).get('RepoTags') or []
+    return _cache_put(_image_tags_cache, image_id, tags, _IMAGE_TTL)
+
+
+_HANDLERS = {}
+
+
+def command_handler(name):
+    """Register a handler function for a command."""
+    def register(fn):
+        _HANDLERS[name] = fn
+        return fn
+    return register
+
+
+def container_op(fn):
+    """Wrap a container command: validate container_id once and translate
+    docker errors into the shared response shapes."""
+    def wrapper(request):
+        container_id = request.get('container_id')
+        if not container_id:
+            return 400, {'error': 'Container ID not provided'}
+        try:
+            return fn(container_id, request)
+        except docker.errors.NotFound:
+            return 404, {'error': 'Container not found'}
+        except Exception as e:
+            return 500, {'error': str(e)}
+    return wrapper
+
+
+@command_handler('list_containers')
+def list_containers(request):
+    return 200, {'result': [c.name for c in client.containers.list()]}
+
+
+@command_handler('get_container_status')
+@container_op
+def get_container_status(container_id, request):
+    info = inspect_container(container_id)
+    # Resolve the image id to its actual repo tags; Config.Image is only
+    # the creation-time reference and may be untagged or a bare id
+    return 200, {'result': {'status': info['State']['Status'], 'image': image_tags(info['Image'])}}
+
+
+@command_handler('start_container')
+@container_op
+def start_container(container_id, request):
+    client.api.start(container_id)
+    # Drop any cached inspect so a status query right after sees the
+    # new state instead of the pre-start snapshot
+    _inspect_cache.pop(container_id, None)
+    return 200, {'result': f'Container {container_id} started'}
+
+
+@command_handler('stop_container')
+@container_op
+def stop_container(container_id, request):
+    client.api.stop(container_id)
+    _inspect_cache.pop(container_id, None)
+    return 200, {'result': f'Container {container_id} stopped'}
+
+
+@command_handler('remove_container')
+@container_op
+def remove_container(container_id, request):
+    client.api.remove_container(container_id)
+    _inspect_cache.pop(container_id, None)
+    return 200, {'result': f'Container {container_id} removed'}
+
+
+@command_handler('list_images')
+def list_images(request):
+    # Low-level API returns raw dicts, skipping docker-py's per-image
+    # model objects and their lazy attribute loading
+    raw = client.api.images()
+    return 200, {'result': [d['RepoTags'][0] if d.get('RepoTags') else d['Id'] for d in raw]}
+
+
+@command_handler('pull_image')
+def pull_image(request):
+    image_name = request.get('image_name')
+    if not image_name:
+        return 400, {'error': 'Image name not provided'}
+    try:
+        client.images.pull(image_name)
+        return 200, {'result': f'Image {image_name} pulled successfully'}
+    except Exception as e:
+        return 500, {'error': str(e)}
+
+
+@command_handler('run_container')
+def run_container(request):
+    image_name = request.get('image_name')
+    container_name = request.get('container_name', None)
+    if not image_name:
+        return 400, {'error': 'Image name not provided'}
+    try:
+        container = client.containers.run(image_name, name=container_name, detach=True)
+        return 200, {'result': f'Container {container.name} started from image {image_name}'}
+    except Exception as e:
+        return 500, {'error': str(e)}
+
+
+@command_handler('get_container_logs')
+@container_op
+def get_container_logs(container_id, request):
+    # Only pull the requested window instead of the container's whole log
+    # history; 'tail' and 'since' come straight from the request
+    tail = request.get('tail', 200)
+    since = request.get('since')
+    logs = client.api.logs(container_id, tail=tail, since=since, stdout=True, stderr=True)
+    return 200, {'result': logs.decode('utf-8', errors='replace')}
+
+
+def unknown_command(request):
+    return 400, {'error': 'Unknown command'}
+
+
+def handle_command(request):
+    """Handle a Docker command request. Runs in a worker thread because
+    docker-py calls block. Returns (status, response)."""
+    command = request.get('command')
+    print(f"Received command: {command}")
+    return _HANDLERS.get(command, unknown_command)(request)
+
+
+@app.post('/')
+async def post_command(http_request: Request):
+    # Run the blocking docker-py call in a thread so long-running commands
+    # (e.g. pull_image) don't stall other requests on the event loop
+    request = orjson.loads(await http_request.body())
+    status, response = await asyncio.to_thread(handle_command, request)
+    return ORJSONResponse(response, status_code=status)
+
 
 # Function to run the server
 def run_server():
-    server_address = ('localhost', 8000)
-    httpd = HTTPServer(server_address, MCPDockerHandler)
     print("🚀 MCP server running at http://localhost:8000")
-    httpd.serve_forever()
+    uvicorn.run(app, host='localhost', port=8000)
+
 
 # Start the server if this file is run directly
 if __name__ == '__main__':
-    run_server()
\ No newline at end of file
+    run_server()
@@ -151,12 +151,36 @@ export class WebSocketServer {
   private async handleMessage(ws: WebSocket, data: string): Promise<void> {
     try {
       const message = JSON.parse(data) as GatewayCommandMessage;
-      
+
+      // Batched frames carry several commands at once; each item has
+      // its own id, so responses correlate as usual. Commands run
+      // concurrently - ordering within a batch is not guaranteed
+      if (message.type === 'batch') {
+        const items = (message as any).items as GatewayCommandMessage[];
+        if (!Array.isArray(items)) {
+          return this.sendError(ws, 'Invalid batch format');
+        }
+        await Promise.all(items.map((item) => this.dispatchCommand(ws, item)));
+        return;
+      }
+
+      await this.dispatchCommand(ws, message);
+    } catch (error) {
+      logger.error('Error handling WebSocket message', { error });
+      this.sendError(ws, 'Error processing command');
+    }
+  }
+
+  /**
+   * Dispatch a single command message to its handler
+   */
+  private async dispatchCommand(ws: WebSocket, message: GatewayCommandMessage): Promise<void> {
+    try {
       // Validate message format
       if (!message.type || !message.command) {
         return this.sendError(ws, 'Invalid message format');
       }
-      
+
       // Handle different command types
       switch (message.command) {
         case 'getContacts':
@@ -171,6 +195,10 @@ export class WebSocketServer {
           await this.handleGetChatMessages(ws, message);
           break;
         
+        case 'searchMessages':
+          await this.handleSearchMessages(ws, message);
+          break;
+
         case 'sendMessage':
           await this.handleSendMessage(ws, message);
           break;
@@ -180,11 +208,13 @@ export class WebSocketServer {
           break;
           
         default:
-          this.sendError(ws, `Unknown command: ${message.command}`);
+          // Keep the id so the client fails the pending future at once
+          // instead of waiting out its timeout
+          this.sendError(ws, `Unknown command: ${message.command}`, message.id);
       }
     } catch (error) {
       logger.error('Error handling WebSocket message', { error });
-      this.sendError(ws, 'Error processing command');
+      this.sendError(ws, 'Error processing command', message.id);
     }
   }
   
@@ -234,6 +264,27 @@ export class WebSocketServer {
     }
   }
   
+  /**
+   * Handle the searchMessages command
+   */
+  private async handleSearchMessages(ws: WebSocket, message: GatewayCommandMessage): Promise<void> {
+    try {
+      if (!message.data || !message.data.query) {
+        return this.sendError(ws, 'Missing query parameter', message.id);
+      }
+
+      const query = message.data.query as string;
+      const chatId = message.data.chatId as string | undefined;
+      const limit = message.data.limit ? parseInt(message.data.limit as string, 10) : 50;
+
+      const messages = await this.whatsAppClient.searchMessages(query, chatId, limit);
+      this.sendResponse(ws, message.id, 'searchMessages', { messages });
+    } catch (error) {
+      logger.error('Error handling searchMessages command', { error });
+      this.sendError(ws, 'Failed to search messages', message.id);
+    }
+  }
+
   /**
    * Handle the sendMessage command
    */
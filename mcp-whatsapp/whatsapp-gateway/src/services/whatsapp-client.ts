@@ -137,6 +137,28 @@ export class WhatsAppClient extends EventEmitter {
     }
   }
   
+  /**
+   * Search messages, optionally scoped to a single chat
+   */
+  public async searchMessages(query: string, chatId?: string, limit: number = 50): Promise<ChatMessage[]> {
+    try {
+      if (!this.isReady) {
+        throw new Error('WhatsApp client is not ready');
+      }
+
+      const options: { limit: number; chatId?: string } = { limit };
+      if (chatId) {
+        options.chatId = chatId;
+      }
+
+      const messages = await this.client.searchMessages(query, options);
+      return messages.map(message => this.convertMessageToChatMessage(message));
+    } catch (error) {
+      logger.error('Failed to search messages', { error, chatId });
+      throw error;
+    }
+  }
+
   /**
    * Send a message to a chat
    */
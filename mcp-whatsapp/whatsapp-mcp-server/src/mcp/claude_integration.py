@@ -4,14 +4,35 @@ Claude Desktop integration module.
 @author Bruno Santos
 """
 
+import re
 import json
 import asyncio
+from operator import itemgetter
 from typing import Dict, Any, List, Optional
 
 from ..utils.logger import logger
 from ..models.message import Message
 from ..models.contact import Contact, Chat
 
+# All command phrases compiled into one alternation, so dispatch is a
+# single C-level scan of the message instead of one scan per phrase.
+# Prefix commands are anchored at the start; the no-argument commands
+# match anywhere, as before. The matched group names the command kind.
+_COMMAND_RE = re.compile(
+    "|".join((
+        r"^(?P<send>send message to )",
+        r"(?P<contacts>show contacts|list contacts|get contacts)",
+        r"(?P<chats>show chats|list chats|get chats)",
+        r"^(?P<messages>show messages from |get messages from )",
+        r"^(?P<search>search messages for |find messages containing )",
+    ))
+)
+
+# C-implemented field extractors for the formatter loops; the gateway
+# schema always supplies these keys (see whatsapp-gateway types)
+_contact_fields = itemgetter("name", "number", "isGroup")
+_chat_fields = itemgetter("name", "unreadCount", "isGroup")
+
 class ClaudeIntegration:
     """Claude Desktop integration helper class."""
     
@@ -20,73 +41,53 @@ class ClaudeIntegration:
         """Format contacts for Claude in a readable format."""
         if not contacts:
             return "No contacts found."
-        
-        result = "Contacts:\n\n"
-        
-        # Group by regular contacts and groups
-        regular_contacts = []
-        groups = []
-        
+
+        # Single pass: format each contact straight into its section
+        # buffer instead of partitioning first and formatting second
+        individual_parts = []
+        group_parts = []
         for contact in contacts:
-            if contact.get("isGroup"):
-                groups.append(contact)
+            name, number, is_group = _contact_fields(contact)
+            if is_group:
+                group_parts.append(f"- {name or 'Unknown Group'}\n")
             else:
-                regular_contacts.append(contact)
-        
-        # Format regular contacts
-        if regular_contacts:
-            result += "Individual Contacts:\n"
-            for contact in regular_contacts:
-                name = contact.get("name") or "Unknown"
-                number = contact.get("number") or "Unknown"
-                result += f"- {name} ({number})\n"
-        
-        # Format groups
-        if groups:
-            result += "\nGroups:\n"
-            for group in groups:
-                name = group.get("name") or "Unknown Group"
-                result += f"- {name}\n"
-        
-        return result
+                individual_parts.append(f"- {name or 'Unknown'} ({number or 'Unknown'})\n")
+
+        parts = ["Contacts:\n\n"]
+        if individual_parts:
+            parts.append("Individual Contacts:\n")
+            parts.extend(individual_parts)
+        if group_parts:
+            parts.append("\nGroups:\n")
+            parts.extend(group_parts)
+
+        return "".join(parts)
     
     @staticmethod
     def format_chats_for_claude(chats: List[Dict[str, Any]]) -> str:
         """Format chats for Claude in a readable format."""
         if not chats:
             return "No chats found."
-        
-        result = "Chats:\n\n"
-        
-        # Group by regular chats and groups
-        regular_chats = []
-        group_chats = []
-        
+
+        # Same single-pass pattern as format_contacts_for_claude
+        individual_parts = []
+        group_parts = []
         for chat in chats:
-            if chat.get("isGroup"):
-                group_chats.append(chat)
-            else:
-                regular_chats.append(chat)
-        
-        # Format regular chats
-        if regular_chats:
-            result += "Individual Chats:\n"
-            for chat in regular_chats:
-                name = chat.get("name") or "Unknown"
-                unread = chat.get("unreadCount", 0)
-                unread_text = f" ({unread} unread)" if unread > 0 else ""
-                result += f"- {name}{unread_text}\n"
-        
-        # Format group chats
-        if group_chats:
-            result += "\nGroup Chats:\n"
-            for chat in group_chats:
-                name = chat.get("name") or "Unknown Group"
-                unread = chat.get("unreadCount", 0)
-                unread_text = f" ({unread} unread)" if unread > 0 else ""
-                result += f"- {name}{unread_text}\n"
-        
-        return result
+            name, unread, is_group = _chat_fields(chat)
+            if not name:
+                name = "Unknown Group" if is_group else "Unknown"
+            unread_text = f" ({unread} unread)" if unread > 0 else ""
+            (group_parts if is_group else individual_parts).append(f"- {name}{unread_text}\n")
+
+        parts = ["Chats:\n\n"]
+        if individual_parts:
+            parts.append("Individual Chats:\n")
+            parts.extend(individual_parts)
+        if group_parts:
+            parts.append("\nGroup Chats:\n")
+            parts.extend(group_parts)
+
+        return "".join(parts)
     
     @staticmethod
     def format_messages_for_claude(messages: List[Dict[str, Any]], chat_name: Optional[str] = None) -> str:
@@ -94,87 +95,89 @@ class ClaudeIntegration:
         if not messages:
             return "No messages found."
         
-        header = f"Messages{' from ' + chat_name if chat_name else ''}:\n\n"
-        result = header
-        
+        parts = [f"Messages{' from ' + chat_name if chat_name else ''}:\n\n"]
+
         # Show messages in reverse chronological order (newest first)
         for message in messages:
-            sender_name = message.get("sender", {}).get("name") or "Unknown"
-            content = message.get("content") or "[Media]" if message.get("hasMedia") else "[Empty]"
-            timestamp = message.get("timestamp", "").split("T")[0]  # Just the date part
-            
-            result += f"{sender_name} ({timestamp}):\n{content}\n\n"
-        
-        return result
+            sender = message.get("sender") or {}
+            sender_name = sender.get("name") or "Unknown"
+
+            # Explicit branches: the old one-liner parsed as
+            # (content or "[Media]") if hasMedia else "[Empty]", dropping
+            # the content of any message without media
+            content = message.get("content")
+            if not content:
+                content = "[Media]" if message.get("hasMedia") else "[Empty]"
+
+            # Just the date part; slicing avoids the list split() allocates
+            timestamp = message.get("timestamp", "")[:10]
+
+            parts.append(f"{sender_name} ({timestamp}):\n{content}\n\n")
+
+        return "".join(parts)
     
     @staticmethod
     def parse_claude_message(message: str) -> Dict[str, Any]:
         """Parse a message from Claude to extract commands."""
-        command = None
-        data = {}
-        
-        # Check for send message command
+        # Lowercase once, then one scan through the combined automaton
+        lowered = message.lower()
+        match = _COMMAND_RE.search(lowered)
+        if match is None:
+            return {"command": None, "data": {}}
+
+        kind = match.lastgroup
+        payload_start = match.end()
+
+        # Send message command
         # Format: "send message to <contact/group name>: <message content>"
-        if "send message to " in message.lower():
+        if kind == "send":
             parts = message.split(":", 1)
             if len(parts) == 2:
-                command = "sendMessage"
-                recipient = parts[0].lower().replace("send message to ", "").strip()
+                # Slice the original-case string so the content keeps its case
+                recipient = parts[0][payload_start:].strip().lower()
                 content = parts[1].strip()
-                data = {
-                    "recipient": recipient,
-                    "content": content,
+                return {
+                    "command": "sendMessage",
+                    "data": {
+                        "recipient": recipient,
+                        "content": content,
+                    },
                 }
-        
-        # Check for get contacts command
-        # Format: "show contacts" or "list contacts"
-        elif any(cmd in message.lower() for cmd in ["show contacts", "list contacts", "get contacts"]):
-            command = "getContacts"
-        
-        # Check for get chats command
-        # Format: "show chats" or "list chats"
-        elif any(cmd in message.lower() for cmd in ["show chats", "list chats", "get chats"]):
-            command = "getChats"
-        
-        # Check for get messages command
+            return {"command": None, "data": {}}
+
+        # No-argument commands: "show contacts", "list chats", etc.
+        if kind == "contacts":
+            return {"command": "getContacts", "data": {}}
+        if kind == "chats":
+            return {"command": "getChats", "data": {}}
+
+        # Get messages command
         # Format: "show messages from <contact/group name>" or "get messages from <contact/group name>"
-        elif any(cmd in message.lower() for cmd in ["show messages from ", "get messages from "]):
-            command = "getChatMessages"
-            for prefix in ["show messages from ", "get messages from "]:
-                if prefix in message.lower():
-                    chat_name = message.lower().replace(prefix, "").strip()
-                    data = {
-                        "chatName": chat_name,
-                    }
-                    break
-        
-        # Check for search messages command
+        if kind == "messages":
+            return {
+                "command": "getChatMessages",
+                "data": {
+                    "chatName": lowered[payload_start:].strip(),
+                },
+            }
+
+        # Search messages command
         # Format: "search messages for <query>" or "find messages containing <query>"
-        elif any(cmd in message.lower() for cmd in ["search messages for ", "find messages containing "]):
-            command = "searchMessages"
-            query = ""
-            chat_name = None
-            
-            if "search messages for " in message.lower():
-                query_part = message.lower().replace("search messages for ", "").strip()
-            elif "find messages containing " in message.lower():
-                query_part = message.lower().replace("find messages containing ", "").strip()
-            
-            # Check if the search is scoped to a specific chat
-            if " in chat " in query_part:
-                query_parts = query_part.split(" in chat ")
-                if len(query_parts) == 2:
-                    query = query_parts[0].strip()
-                    chat_name = query_parts[1].strip()
-            else:
-                query = query_part
-            
-            data = {
+        query_part = lowered[payload_start:].strip()
+        query = query_part
+        chat_name = None
+
+        # Check if the search is scoped to a specific chat
+        if " in chat " in query_part:
+            query_parts = query_part.split(" in chat ")
+            if len(query_parts) == 2:
+                query = query_parts[0].strip()
+                chat_name = query_parts[1].strip()
+
+        return {
+            "command": "searchMessages",
+            "data": {
                 "query": query,
                 "chatName": chat_name,
-            }
-        
-        return {
-            "command": command,
-            "data": data,
+            },
         }
@@ -7,54 +7,95 @@ Router for MCP API endpoints.
 import os
 import json
 import base64
-from typing import Dict, Any, List, Optional
-from fastapi import APIRouter, Request, Response, Depends, HTTPException, UploadFile, File, Form
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel, Field
+from typing import Dict, Any, List, NotRequired, Optional, TypedDict
+from fastapi import APIRouter, Request, Response, Depends, HTTPException, UploadFile, File, Form, Body
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import BaseModel, ConfigDict, Field
 
 from ..utils.logger import logger
 
-# API Models
-class MessageRequest(BaseModel):
-    """Message request model."""
-    
-    chat_id: str = Field(...)
-    content: str = Field(...)
+# API Models. The simple bodies are TypedDicts so FastAPI only parses
+# the JSON without running a pydantic constructor per request; media
+# keeps full validation since it carries user-supplied binary payloads.
+class MessageRequest(TypedDict):
+    """Message request body."""
+
+    chat_id: str
+    content: str
 
 class MediaMessageRequest(BaseModel):
     """Media message request model."""
-    
+
+    model_config = ConfigDict(extra="ignore")
+
     chat_id: str = Field(...)
     media: str = Field(...)  # Base64 encoded media
     filename: str = Field(...)
     caption: Optional[str] = Field(default=None)
     media_type: Optional[str] = Field(default=None)
 
-class SearchRequest(BaseModel):
-    """Search request model."""
-    
-    query: str = Field(...)
-    chat_id: Optional[str] = Field(default=None)
+class SearchRequest(TypedDict):
+    """Search request body."""
+
+    query: str
+    chat_id: NotRequired[Optional[str]]
 
-# Create router
-router = APIRouter()
+# Create router; ORJSONResponse serializes responses with orjson instead
+# of stdlib json, which matters for large contact/message payloads
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# Pre-rendered empty responses: clients poll these endpoints while the
+# gateway is still authenticating, so serve the common "nothing yet"
+# answer without re-encoding it. Starlette responses render their body
+# once and are safe to return repeatedly.
+_EMPTY_CONTACTS = ORJSONResponse({"success": True, "contacts": [], "message": "No contacts found."})
+_EMPTY_CHATS = ORJSONResponse({"success": True, "chats": [], "message": "No chats found."})
 
 # Helper function to get MCP handler
 async def get_mcp_handler(request: Request):
     """Get the MCP handler from the request state."""
     return request.app.state.mcp_handler
 
+# Helper function to get the cache manager, if the app exposes one
+def get_cache_manager(request: Request):
+    """Get the cache manager from the request state."""
+    return getattr(request.app.state, "cache_manager", None)
+
 @router.get("/contacts")
 async def get_contacts(request: Request):
     """Get contacts endpoint."""
     mcp_handler = await get_mcp_handler(request)
-    return await mcp_handler.handle_get_contacts("api", {"command": "getContacts"})
+
+    # Short-circuit repeat polls: if the client already holds the current
+    # version of the list, skip serialization and transfer entirely
+    cache_manager = get_cache_manager(request)
+    etag = await cache_manager.get_contacts_etag() if cache_manager else None
+    if etag and request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    result = await mcp_handler.handle_get_contacts("api", {"command": "getContacts"})
+    if etag:
+        return ORJSONResponse(result, headers={"ETag": etag})
+    if isinstance(result, dict) and result.get("success") and not result.get("contacts"):
+        return _EMPTY_CONTACTS
+    return result
 
 @router.get("/chats")
 async def get_chats(request: Request):
     """Get chats endpoint."""
     mcp_handler = await get_mcp_handler(request)
-    return await mcp_handler.handle_get_chats("api", {"command": "getChats"})
+
+    cache_manager = get_cache_manager(request)
+    etag = await cache_manager.get_chats_etag() if cache_manager else None
+    if etag and request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    result = await mcp_handler.handle_get_chats("api", {"command": "getChats"})
+    if etag:
+        return ORJSONResponse(result, headers={"ETag": etag})
+    if isinstance(result, dict) and result.get("success") and not result.get("chats"):
+        return _EMPTY_CHATS
+    return result
 
 @router.get("/chats/{chat_id}/messages")
 async def get_chat_messages(request: Request, chat_id: str, limit: int = 50):
@@ -73,17 +114,17 @@ async def get_chat_messages(request: Request, chat_id: str, limit: int = 50):
     )
 
 @router.post("/messages")
-async def send_message(message_request: MessageRequest, request: Request):
+async def send_message(request: Request, message_request: MessageRequest = Body(...)):
     """Send message endpoint."""
     mcp_handler = await get_mcp_handler(request)
-    
+
     return await mcp_handler.handle_send_message(
         "api",
         {
             "command": "sendMessage",
             "data": {
-                "chatId": message_request.chat_id,
-                "content": message_request.content,
+                "chatId": message_request["chat_id"],
+                "content": message_request["content"],
             },
         },
     )
@@ -118,9 +159,13 @@ async def upload_media(
     mcp_handler = await get_mcp_handler(request)
     
     try:
-        # Read file contents
-        contents = await file.read()
-        
+        # Read the upload in 1MB chunks instead of buffering the whole
+        # file in one read; b64encode accepts the bytearray directly so
+        # no extra full-size copy is made before encoding
+        contents = bytearray()
+        while chunk := await file.read(1 << 20):
+            contents.extend(chunk)
+
         # Convert to base64
         media_base64 = base64.b64encode(contents).decode("utf-8")
         
@@ -151,17 +196,17 @@ async def get_qr_code(request: Request):
     return await mcp_handler.handle_get_qr_code("api", {"command": "getQRCode"})
 
 @router.post("/search")
-async def search_messages(search_request: SearchRequest, request: Request):
+async def search_messages(request: Request, search_request: SearchRequest = Body(...)):
     """Search messages endpoint."""
     mcp_handler = await get_mcp_handler(request)
-    
+
     return await mcp_handler.handle_search_messages(
         "api",
         {
             "command": "searchMessages",
             "data": {
-                "query": search_request.query,
-                "chatId": search_request.chat_id,
+                "query": search_request["query"],
+                "chatId": search_request.get("chat_id"),
             },
         },
     )
\ No newline at end of file
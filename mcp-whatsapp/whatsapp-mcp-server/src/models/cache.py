@@ -7,36 +7,112 @@ Cache manager for the MCP WhatsApp Server.
 import os
 import json
 import time
+import bisect
 import asyncio
+import hashlib
 from pathlib import Path
-from typing import Dict, Any, Optional, List, Union
-from diskcache import Cache
-from expiringdict import ExpiringDict
+from typing import Dict, Any, Optional, List, Tuple, Union
+import orjson
+from cachetools import TTLCache
+from diskcache import Cache, Disk, UNKNOWN
+
+# Redis is optional: when a redis_url is configured and the client
+# library is installed, the cache becomes a shared read-through layer
+# across server replicas; without it everything stays per-process.
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
 
 from ..utils.logger import logger
 
+class OrjsonDisk(Disk):
+    """diskcache Disk that serializes values with orjson instead of pickle.
+
+    Everything this cache stores (contact/chat/message lists, the message
+    index, QR-code strings) is JSON-compatible, so orjson gives faster
+    and more compact reads/writes than the default pickle round-trip.
+    """
+
+    def store(self, value, read, key=UNKNOWN):
+        if not read:
+            value = orjson.dumps(value)
+        return super().store(value, read, key=key)
+
+    def fetch(self, mode, filename, value, read):
+        data = super().fetch(mode, filename, value, read)
+        if not read:
+            data = orjson.loads(data)
+        return data
+
+def _etag(value: Any) -> str:
+    """Compute a cheap content fingerprint for HTTP conditional requests."""
+    return hashlib.blake2b(orjson.dumps(value), digest_size=8).hexdigest()
+
+def _lowercase_columns(items: List[Dict[str, Any]], *fields: str) -> Dict[str, List[str]]:
+    """Build parallel lists of lowercased field values for filtering.
+
+    Lowercasing happens once at write time, so query-time filtering is a
+    plain substring scan over flat strings instead of per-item lower()
+    calls on every request.
+    """
+    return {field: [item.get(field, "").lower() for item in items] for field in fields}
+
+def _index_messages(messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Build the id-keyed index and timestamp-sorted order for messages.
+
+    Id-less messages key under "" (not None, which would blow up the
+    sort on a timestamp tie); like any duplicate id, they collapse to
+    the last occurrence.
+    """
+    by_id = {(m.get("id") or ""): m for m in messages}
+    order = sorted([m.get("timestamp", ""), mid] for mid, m in by_id.items())
+    return {"by_id": by_id, "order": order}
+
 class CacheManager:
     """Cache manager for the MCP WhatsApp Server."""
     
-    def __init__(self, cache_dir: str, ttl: int = 86400):
+    def __init__(self, cache_dir: str, ttl: int = 86400, redis_url: Optional[str] = None):
         """Initialize the cache manager."""
         self.cache_dir = Path(cache_dir)
         self.ttl = ttl
+
+        # Optional shared Redis layer; a hit here saves other replicas a
+        # websocket round-trip to the gateway
+        self.redis = None
+        if redis_url and aioredis is not None:
+            self.redis = aioredis.from_url(redis_url)
         
         # Create cache directory if it doesn't exist
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         
         # Initialize disk cache
-        self.disk_cache = Cache(directory=str(self.cache_dir / "disk_cache"))
+        self.disk_cache = Cache(directory=str(self.cache_dir / "disk_cache"), disk=OrjsonDisk)
         
-        # Initialize memory cache
-        self.memory_cache: ExpiringDict = ExpiringDict(
-            max_len=1000,  # Maximum number of items in the cache
-            max_age_seconds=ttl,  # TTL in seconds
+        # Initialize memory cache; TTLCache expires entries off a
+        # monotonic clock instead of walking all keys per access the way
+        # ExpiringDict did
+        self.memory_cache: TTLCache = TTLCache(
+            maxsize=1000,  # Maximum number of items in the cache
+            ttl=ttl,  # TTL in seconds
         )
         
-        # Lock for cache operations
+        # Lock only guards close(); diskcache is internally locked (SQLite)
+        # and the memory cache is thread-safe, so per-operation locking
+        # would just force extra context switches on every hit
         self.lock = asyncio.Lock()
+
+        # Monotonic write times for stale-while-revalidate reads; kept
+        # in memory only, so entries read back from disk after a restart
+        # count as stale and get refreshed in the background
+        self._write_times: Dict[str, float] = {}
+
+        # In-memory casefolded search indexes, rebuilt on every
+        # set_contacts/set_chats; None until the first write, after
+        # which a filtered lookup is a scan over precomputed strings
+        self._contacts_idx: Optional[List[tuple]] = None
+        self._chats_idx: Optional[List[tuple]] = None
+        self._chat_ids: Optional[List[str]] = None
     
     async def get(self, key: str) -> Optional[Any]:
         """Get a value from the cache."""
@@ -47,39 +123,83 @@ class CacheManager:
             return value
         
         # Try disk cache
-        async with self.lock:
-            if key in self.disk_cache:
-                value = self.disk_cache[key]
-                # Update memory cache
-                self.memory_cache[key] = value
-                logger.debug(f"Cache hit (disk): {key}")
-                return value
+        if key in self.disk_cache:
+            value = self.disk_cache[key]
+            # Update memory cache
+            self.memory_cache[key] = value
+            logger.debug(f"Cache hit (disk): {key}")
+            return value
         
+        # Try the shared Redis layer last: another replica may have
+        # fetched this from the gateway already
+        if self.redis is not None:
+            try:
+                raw = await self.redis.get(f"wa:{key}")
+            except Exception as e:
+                logger.warning(f"Redis get failed for {key}: {e}")
+            else:
+                if raw is not None:
+                    value = orjson.loads(raw)
+                    self.memory_cache[key] = value
+                    self.disk_cache.set(key, value, expire=self.ttl)
+                    logger.debug(f"Cache hit (redis): {key}")
+                    return value
+
         logger.debug(f"Cache miss: {key}")
         return None
-    
+
     async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
         """Set a value in the cache."""
         # Set in memory cache
         self.memory_cache[key] = value
-        
+
         # Set in disk cache
-        async with self.lock:
-            self.disk_cache.set(key, value, expire=ttl or self.ttl)
-        
+        self.disk_cache.set(key, value, expire=ttl or self.ttl)
+
+        # Publish to the shared Redis layer for other replicas
+        if self.redis is not None:
+            try:
+                await self.redis.set(f"wa:{key}", orjson.dumps(value), ex=ttl or self.ttl)
+            except Exception as e:
+                logger.warning(f"Redis set failed for {key}: {e}")
+
+        self._write_times[key] = time.monotonic()
         logger.debug(f"Cache set: {key}")
-    
+
+    def is_fresh(self, key: str, fresh_for: float) -> bool:
+        """Check whether a key was written less than fresh_for seconds ago."""
+        written = self._write_times.get(key)
+        return written is not None and (time.monotonic() - written) < fresh_for
+
+    async def get_swr(self, key: str, fresh_for: float) -> Tuple[Optional[Any], bool]:
+        """Get a value plus whether it is still fresh.
+
+        Returns (value, is_fresh). A present-but-stale value lets the
+        caller answer immediately and refresh in the background instead
+        of blocking on a gateway round-trip at the TTL boundary.
+        """
+        value = await self.get(key)
+        if value is None:
+            return None, False
+        return value, self.is_fresh(key, fresh_for)
+
     async def delete(self, key: str) -> None:
         """Delete a value from the cache."""
         # Delete from memory cache
         if key in self.memory_cache:
             del self.memory_cache[key]
-        
+
         # Delete from disk cache
-        async with self.lock:
-            if key in self.disk_cache:
-                del self.disk_cache[key]
-        
+        if key in self.disk_cache:
+            del self.disk_cache[key]
+
+        if self.redis is not None:
+            try:
+                await self.redis.delete(f"wa:{key}")
+            except Exception as e:
+                logger.warning(f"Redis delete failed for {key}: {e}")
+
+        self._write_times.pop(key, None)
         logger.debug(f"Cache delete: {key}")
     
     async def clear(self) -> None:
@@ -88,9 +208,9 @@ class CacheManager:
         self.memory_cache.clear()
         
         # Clear disk cache
-        async with self.lock:
-            self.disk_cache.clear()
-        
+        self.disk_cache.clear()
+
+        self._write_times.clear()
         logger.info("Cache cleared")
     
     async def close(self) -> None:
@@ -98,70 +218,195 @@ class CacheManager:
         # Close disk cache
         async with self.lock:
             self.disk_cache.close()
-        
+
+        if self.redis is not None:
+            try:
+                await self.redis.aclose()
+            except Exception as e:
+                logger.warning(f"Error closing Redis connection: {e}")
+
         logger.info("Cache closed")
     
     async def stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
-        disk_stats = {}
-        
-        async with self.lock:
-            disk_stats = dict(self.disk_cache.stats())
+        disk_stats = dict(self.disk_cache.stats())
         
         return {
             "memory": {
                 "size": len(self.memory_cache),
-                "max_size": self.memory_cache.max_len,
-                "ttl": self.memory_cache.max_age_seconds,
+                "max_size": self.memory_cache.maxsize,
+                "ttl": self.memory_cache.ttl,
             },
             "disk": disk_stats,
         }
     
     # Specialized cache methods for WhatsApp data
     
+    def peek_contacts(self) -> Optional[List[Dict[str, Any]]]:
+        """Get contacts from the memory cache without awaiting.
+
+        Skips the disk/Redis fallbacks and the event-loop hop of the
+        async getter; hot handlers use this first and only await the
+        full lookup on a miss.
+        """
+        return self.memory_cache.get("contacts")
+
     async def get_contacts(self) -> Optional[List[Dict[str, Any]]]:
         """Get contacts from the cache."""
-        return await self.get("contacts")
-    
+        contacts = await self.get("contacts")
+        # A read after restart only has the disk copy; rebuild the
+        # in-memory index here so searches stay on the fast path
+        if contacts is not None and self._contacts_idx is None:
+            self._contacts_idx = self._build_contacts_idx(contacts)
+        return contacts
+
+    @staticmethod
+    def _build_contacts_idx(contacts: List[Dict[str, Any]]) -> List[tuple]:
+        """Build the casefolded (name, number, contact) search index."""
+        return [
+            (c.get("name", "").casefold(), c.get("number", "").casefold(), c)
+            for c in contacts
+        ]
+
     async def set_contacts(self, contacts: List[Dict[str, Any]]) -> None:
         """Set contacts in the cache."""
         await self.set("contacts", contacts)
-    
+        await self.set("contacts:etag", _etag(contacts))
+        await self.set("contacts:lc", _lowercase_columns(contacts, "name", "number"))
+        self._contacts_idx = self._build_contacts_idx(contacts)
+
+    async def get_contacts_etag(self) -> Optional[str]:
+        """Get the fingerprint of the cached contacts list."""
+        return await self.get("contacts:etag")
+
+    async def get_contacts_index(self) -> Optional[Dict[str, List[str]]]:
+        """Get the lowercased name/number columns for the cached contacts."""
+        return await self.get("contacts:lc")
+
+    def search_contacts(self, query: str) -> Optional[List[Dict[str, Any]]]:
+        """Filter cached contacts through the in-memory casefolded index.
+
+        Returns None when no index exists yet (nothing written this
+        process); callers then fall back to the persisted columns.
+        """
+        if self._contacts_idx is None:
+            return None
+        q = query.casefold()
+        return [c for name, number, c in self._contacts_idx if q in name or q in number]
+
+    def peek_chats(self) -> Optional[List[Dict[str, Any]]]:
+        """Get chats from the memory cache without awaiting."""
+        return self.memory_cache.get("chats")
+
     async def get_chats(self) -> Optional[List[Dict[str, Any]]]:
         """Get chats from the cache."""
-        return await self.get("chats")
-    
+        chats = await self.get("chats")
+        if chats is not None and self._chats_idx is None:
+            self._chats_idx = self._build_chats_idx(chats)
+            self._chat_ids = [c["id"] for c in chats if c.get("id")]
+        return chats
+
+    def peek_chat_ids(self) -> Optional[List[str]]:
+        """Get the cached chat ids without awaiting.
+
+        Backed by a flat list precomputed at write time, so enumerating
+        chats (e.g. for a search fan-out) skips both the async cache
+        lookup and a per-chat dict access.
+        """
+        return self._chat_ids
+
+    @staticmethod
+    def _build_chats_idx(chats: List[Dict[str, Any]]) -> List[tuple]:
+        """Build the casefolded (name, chat) search index."""
+        return [(c.get("name", "").casefold(), c) for c in chats]
+
     async def set_chats(self, chats: List[Dict[str, Any]]) -> None:
         """Set chats in the cache."""
         await self.set("chats", chats)
+        await self.set("chats:etag", _etag(chats))
+        await self.set("chats:lc", _lowercase_columns(chats, "name"))
+        self._chats_idx = self._build_chats_idx(chats)
+        self._chat_ids = [c["id"] for c in chats if c.get("id")]
+
+    async def get_chats_etag(self) -> Optional[str]:
+        """Get the fingerprint of the cached chats list."""
+        return await self.get("chats:etag")
+
+    async def get_chats_index(self) -> Optional[Dict[str, List[str]]]:
+        """Get the lowercased name column for the cached chats."""
+        return await self.get("chats:lc")
+
+    def search_chats(self, query: str) -> Optional[List[Dict[str, Any]]]:
+        """Filter cached chats through the in-memory casefolded index."""
+        if self._chats_idx is None:
+            return None
+        q = query.casefold()
+        return [c for name, c in self._chats_idx if q in name]
     
     async def get_chat_messages(self, chat_id: str) -> Optional[List[Dict[str, Any]]]:
-        """Get chat messages from the cache."""
-        return await self.get(f"chat_messages:{chat_id}")
-    
+        """Get chat messages from the cache (newest first)."""
+        entry = await self.get(f"chat_messages:{chat_id}")
+        if entry is None:
+            return None
+
+        # Entries written before the indexed format are plain lists
+        if isinstance(entry, list):
+            return entry
+
+        by_id = entry["by_id"]
+        return [by_id[mid] for _, mid in reversed(entry["order"])]
+
+    async def get_chat_messages_swr(
+        self, chat_id: str, fresh_for: float
+    ) -> Tuple[Optional[List[Dict[str, Any]]], bool]:
+        """Get chat messages (newest first) plus their freshness."""
+        entry, fresh = await self.get_swr(f"chat_messages:{chat_id}", fresh_for)
+        if entry is None:
+            return None, False
+        if isinstance(entry, list):
+            return entry, fresh
+        by_id = entry["by_id"]
+        return [by_id[mid] for _, mid in reversed(entry["order"])], fresh
+
     async def set_chat_messages(self, chat_id: str, messages: List[Dict[str, Any]]) -> None:
         """Set chat messages in the cache."""
-        await self.set(f"chat_messages:{chat_id}", messages)
-    
+        await self.set(f"chat_messages:{chat_id}", _index_messages(messages))
+
     async def add_chat_message(self, chat_id: str, message: Dict[str, Any]) -> None:
-        """Add a message to the chat messages cache."""
-        messages = await self.get_chat_messages(chat_id) or []
-        
-        # Check if message already exists
-        for i, msg in enumerate(messages):
-            if msg.get("id") == message.get("id"):
-                # Update existing message
-                messages[i] = message
-                await self.set_chat_messages(chat_id, messages)
-                return
-        
-        # Add new message
-        messages.append(message)
-        
-        # Sort messages by timestamp
-        messages.sort(key=lambda m: m.get("timestamp", ""), reverse=True)
-        
-        await self.set_chat_messages(chat_id, messages)
+        """Add a message to the chat messages cache.
+
+        Messages are indexed by id with a timestamp-sorted order list, so
+        an insert is a dict store plus bisect.insort instead of the old
+        linear scan and full re-sort of the whole list.
+        """
+        key = f"chat_messages:{chat_id}"
+        entry = await self.get(key)
+        if entry is None or isinstance(entry, list):
+            entry = _index_messages(entry or [])
+
+        by_id = entry["by_id"]
+        order = entry["order"]
+        # Normalize like the refresh path does: a "" id keeps the order
+        # list sortable, and the stamped timestamp key lets search sort
+        # sent messages with itemgetter alongside fetched ones
+        message_id = message.get("id") or ""
+        timestamp = message.setdefault("timestamp", "")
+
+        existing = by_id.get(message_id)
+        by_id[message_id] = message
+
+        if existing is not None:
+            # Update in place; fix the order entry if the timestamp moved
+            old_timestamp = existing.get("timestamp", "")
+            if old_timestamp != timestamp:
+                index = bisect.bisect_left(order, [old_timestamp, message_id])
+                if index < len(order) and order[index] == [old_timestamp, message_id]:
+                    del order[index]
+                bisect.insort(order, [timestamp, message_id])
+        else:
+            bisect.insort(order, [timestamp, message_id])
+
+        await self.set(key, entry)
     
     async def get_qr_code(self) -> Optional[str]:
         """Get the QR code from the cache."""
@@ -5,67 +5,44 @@ Contact and chat models for the MCP WhatsApp Server.
 """
 
 from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 class Contact(BaseModel):
-    """Model for WhatsApp contact."""
-    
+    """Model for WhatsApp contact.
+
+    Field aliases match the gateway wire names, so serialization is a
+    single model_dump(by_alias=True) through pydantic's native serializer
+    instead of a hand-built dict per instance.
+    """
+
+    model_config = ConfigDict(populate_by_name=True, frozen=True)
+
     id: str = Field(...)
     name: str = Field(default="")
     number: str = Field(default="")
-    is_group: bool = Field(default=False)
-    is_my_contact: bool = Field(default=False)
-    
+    is_group: bool = Field(default=False, alias="isGroup")
+    is_my_contact: bool = Field(default=False, alias="isMyContact")
+
     @classmethod
     def from_gateway(cls, data: Dict[str, Any]) -> "Contact":
         """Create a Contact from WhatsApp Gateway data."""
-        return cls(
-            id=data.get("id", ""),
-            name=data.get("name", ""),
-            number=data.get("number", ""),
-            is_group=data.get("isGroup", False),
-            is_my_contact=data.get("isMyContact", False),
-        )
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert the contact to a dictionary."""
-        return {
-            "id": self.id,
-            "name": self.name,
-            "number": self.number,
-            "isGroup": self.is_group,
-            "isMyContact": self.is_my_contact,
-        }
+        return cls.model_validate(data)
 
 class Chat(BaseModel):
     """Model for WhatsApp chat."""
-    
+
+    model_config = ConfigDict(populate_by_name=True, frozen=True)
+
     id: str = Field(...)
     name: str = Field(default="")
-    is_group: bool = Field(default=False)
+    is_group: bool = Field(default=False, alias="isGroup")
     timestamp: str = Field(default="")
-    unread_count: int = Field(default=0)
-    
+    unread_count: int = Field(default=0, alias="unreadCount")
+
     @classmethod
     def from_gateway(cls, data: Dict[str, Any]) -> "Chat":
         """Create a Chat from WhatsApp Gateway data."""
-        return cls(
-            id=data.get("id", ""),
-            name=data.get("name", ""),
-            is_group=data.get("isGroup", False),
-            timestamp=data.get("timestamp", ""),
-            unread_count=data.get("unreadCount", 0),
-        )
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert the chat to a dictionary."""
-        return {
-            "id": self.id,
-            "name": self.name,
-            "isGroup": self.is_group,
-            "timestamp": self.timestamp,
-            "unreadCount": self.unread_count,
-        }
+        return cls.model_validate(data)
 
 class ContactsResponse(BaseModel):
     """Model for contacts response to Claude Desktop."""
@@ -5,73 +5,122 @@ Message models for the MCP WhatsApp Server.
 """
 
 from datetime import datetime
+from functools import lru_cache
 from typing import List, Optional, Dict, Any, Union
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+from pydantic.dataclasses import dataclass
 
-class MessageSender(BaseModel):
-    """Model for message sender."""
-    
-    id: str = Field(...)
-    name: str = Field(default="")
+@lru_cache(maxsize=4096)
+def _parse_iso(value: str) -> datetime:
+    """Parse an ISO timestamp, memoized by the raw string.
+
+    Gateway batches repeat timestamp strings (second granularity), so
+    the cache turns most parses into a dict hit; safe because datetime
+    is immutable.
+    """
+    return datetime.fromisoformat(value)
+
+@dataclass(frozen=True, slots=True)
+class MessageSender:
+    """Model for message sender.
+
+    A slotted dataclass instead of a BaseModel: every Message carries
+    one of these, and slots drop the per-instance __dict__ while
+    pydantic-core still validates it as a Message field.
+    """
+
+    id: str
+    name: str = ""
 
 class Message(BaseModel):
-    """Model for WhatsApp message."""
-    
+    """Model for WhatsApp message.
+
+    Field aliases match the gateway wire names, so construction and
+    serialization both run through pydantic-core (including the nested
+    MessageSender and the datetime round-trip) rather than per-field
+    Python dict work.
+    """
+
+    model_config = ConfigDict(populate_by_name=True)
+
     id: str = Field(...)
-    chat_id: str = Field(...)
+    chat_id: str = Field(..., alias="chatId")
     content: str = Field(default="")
     timestamp: datetime = Field(default_factory=datetime.now)
     sender: MessageSender = Field(...)
-    has_media: bool = Field(default=False)
-    is_group: bool = Field(default=False)
-    is_forwarded: bool = Field(default=False)
-    mentioned_ids: List[str] = Field(default_factory=list)
-    media_url: Optional[str] = Field(default=None)
-    media_type: Optional[str] = Field(default=None)
-    
-    class Config:
-        """Pydantic configuration."""
-        
-        json_encoders = {
-            datetime: lambda v: v.isoformat(),
-        }
-    
+    has_media: bool = Field(default=False, alias="hasMedia")
+    is_group: bool = Field(default=False, alias="isGroup")
+    is_forwarded: bool = Field(default=False, alias="isForwarded")
+    mentioned_ids: List[str] = Field(default_factory=list, alias="mentionedIds")
+    media_url: Optional[str] = Field(default=None, alias="mediaUrl")
+    media_type: Optional[str] = Field(default=None, alias="mediaType")
+
     @classmethod
-    def from_gateway(cls, data: Dict[str, Any]) -> "Message":
-        """Create a Message from WhatsApp Gateway data."""
-        return cls(
+    def from_gateway(cls, data: Dict[str, Any], validate: bool = False) -> "Message":
+        """Create a Message from WhatsApp Gateway data.
+
+        The gateway is a trusted source, so the default path builds the
+        model through model_construct and skips pydantic-core validation
+        entirely — the dominant cost when hydrating a whole chat's worth
+        of messages. Pass validate=True for data from anywhere else.
+        """
+        if validate:
+            return cls.model_validate(data)
+        sender = data.get("sender") or {}
+        # dict.get evaluates its default eagerly, so the now().isoformat()
+        # fallback used to run per message even when a timestamp was
+        # present; branch instead and build the datetime directly
+        raw_timestamp = data.get("timestamp")
+        return cls.model_construct(
             id=data.get("id", ""),
             chat_id=data.get("chatId", ""),
             content=data.get("content", ""),
-            timestamp=datetime.fromisoformat(data.get("timestamp", datetime.now().isoformat())),
-            sender=MessageSender(
-                id=data.get("sender", {}).get("id", ""),
-                name=data.get("sender", {}).get("name", ""),
-            ),
+            timestamp=_parse_iso(raw_timestamp) if raw_timestamp else datetime.now(),
+            sender=MessageSender(id=sender.get("id", ""), name=sender.get("name", "")),
             has_media=data.get("hasMedia", False),
             is_group=data.get("isGroup", False),
             is_forwarded=data.get("isForwarded", False),
             mentioned_ids=data.get("mentionedIds", []),
+            media_url=data.get("mediaUrl"),
+            media_type=data.get("mediaType"),
         )
-    
+
     def to_dict(self) -> Dict[str, Any]:
-        """Convert the message to a dictionary."""
-        return {
-            "id": self.id,
-            "chatId": self.chat_id,
-            "content": self.content,
-            "timestamp": self.timestamp.isoformat(),
-            "sender": {
-                "id": self.sender.id,
-                "name": self.sender.name,
-            },
-            "hasMedia": self.has_media,
-            "isGroup": self.is_group,
-            "isForwarded": self.is_forwarded,
-            "mentionedIds": self.mentioned_ids,
-            "mediaUrl": self.media_url,
-            "mediaType": self.media_type,
-        }
+        """Convert the message to a dictionary in gateway wire format."""
+        return self.model_dump(mode="json", by_alias=True)
+
+# Optional serialize-only fast path: msgspec structs encode several
+# times faster than pydantic models, which pays off when dumping whole
+# chats. The pydantic Message stays authoritative for anything that
+# needs validation; this mirror only exists when msgspec is installed.
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+if msgspec is not None:
+    class MessageFast(msgspec.Struct, rename="camel"):
+        """Serialization-only mirror of Message in gateway wire format."""
+
+        id: str
+        chat_id: str
+        sender: Dict[str, str]
+        content: str = ""
+        timestamp: str = ""
+        has_media: bool = False
+        is_group: bool = False
+        is_forwarded: bool = False
+        mentioned_ids: List[str] = msgspec.field(default_factory=list)
+        media_url: Optional[str] = None
+        media_type: Optional[str] = None
+
+        def to_dict(self) -> Dict[str, Any]:
+            """Convert the message to a dictionary in gateway wire format."""
+            return msgspec.to_builtins(self)
+
+        def to_json(self) -> bytes:
+            """Encode the message as JSON bytes."""
+            return msgspec.json.encode(self)
 
 class MessageRequest(BaseModel):
     """Model for message request from Claude Desktop."""
@@ -5,13 +5,30 @@ using FastMCP to simplify the MCP protocol.
 
 @author Bruno Santos
 """
+import re
 import sys
+import heapq
+import base64
 import signal
 import asyncio
+from pathlib import Path
+from operator import itemgetter
+from functools import lru_cache, wraps
+
+# Use uvloop when available: the server is pure network I/O (gateway
+# websocket + stdio) and libuv cuts per-await overhead measurably. The
+# policy must be set before FastMCP is constructed so every loop it
+# creates — not just the one in __main__ — is a uvloop one.
+try:
+    import uvloop
+    uvloop.install()
+except ImportError:
+    pass
+
 from mcp.server.fastmcp import FastMCP
 from typing import Dict, Any, List, Optional
 
-from .utils.logger import logger
+from .utils.logger import logger, media_log
 from .utils.config import load_config
 from .websocket.client import WhatsAppGatewayClient
 from .models.cache import CacheManager
@@ -20,7 +37,7 @@ from .models.cache import CacheManager
 config = load_config()
 
 # Initialize cache manager
-cache_manager = CacheManager(config.cache_dir)
+cache_manager = CacheManager(config.cache_dir, redis_url=config.redis_url)
 
 # Initialize WhatsApp Gateway client
 gateway_client = WhatsAppGatewayClient(
@@ -29,60 +46,263 @@ gateway_client = WhatsAppGatewayClient(
     max_reconnect_attempts=config.max_reconnect_attempts,
 )
 
+# Pre-bound method references for the hot paths. Binding once at module
+# scope skips the instance attribute walk on every tool invocation; the
+# instances live for the process, so the bound methods never go stale.
+_gw_send_command = gateway_client.send_command
+_cm_add_chat_message = cache_manager.add_chat_message
+
 # Initialize FastMCP server
 mcp = FastMCP("whatsapp")
 
+# Shared error responses. These are returned verbatim and serialized by
+# FastMCP without mutation, so one instance per shape avoids a fresh
+# dict allocation on every error path.
+_ERR_MISSING_MESSAGE_ARGS = {"success": False, "error": "Missing chat_id or content"}
+_ERR_MISSING_MEDIA_ARGS = {"success": False, "error": "Missing required parameters"}
+_ERR_NOT_CONNECTED = {"success": False, "error": "Failed to connect to WhatsApp Gateway"}
+_ERR_SEND_FAILED = {"success": False, "error": "Failed to send message"}
+_ERR_MEDIA_BAD_RESPONSE = {"success": False, "error": "Failed to send media: Unexpected response format"}
 
-# Helper function to ensure connection
-async def ensure_connection() -> bool:
-    """Ensure connection to WhatsApp Gateway, reconnect if needed."""
-    if not gateway_client.is_connected():
-        logger.warning("Not connected to WhatsApp Gateway. Attempting to connect...")
+# Media types the gateway understands
+_VALID_MEDIA_TYPES = frozenset({"image", "video", "audio", "document"})
+
+# Set when the gateway answers searchMessages with a command error
+# (i.e. it predates the command), so only the first search pays the
+# failed-probe round-trip before dropping into the fan-out
+_gateway_search_unsupported = False
+
+# Stale-while-revalidate: cached lists answer immediately for their
+# whole TTL, but past the fresh window a background refresh repopulates
+# them so the data converges without blocking the caller. The set
+# suppresses refresh stampedes when several stale reads land together.
+_FRESH_FOR = config.cache_ttl // 2
+_refreshing: set = set()
+
+# Strong references to in-flight refresh tasks: the loop only keeps a
+# weak one, so an unreferenced task can be collected mid-refresh
+_refresh_tasks: set = set()
+
+
+def _spawn_refresh(key: str, refresh) -> None:
+    """Start a background cache refresh unless one is already running."""
+    if key in _refreshing:
+        return
+    _refreshing.add(key)
+
+    async def _run():
         try:
-            connection_success = await gateway_client.connect()
-            if gateway_client.is_connected():
-                logger.info("Successfully connected to WhatsApp Gateway")
-                return True
-            else:
-                logger.error("Failed to connect to WhatsApp Gateway despite successful connection call")
-                return False
+            await refresh()
         except Exception as e:
-            logger.error(f"Error connecting to WhatsApp Gateway: {e}")
-            return False
-    return True
+            logger.debug(f"Background refresh of {key} failed: {e}")
+        finally:
+            _refreshing.discard(key)
+
+    task = asyncio.create_task(_run())
+    _refresh_tasks.add(task)
+    task.add_done_callback(_refresh_tasks.discard)
+
+
+# Filtering helpers. The cache stores pre-lowercased columns next to the
+# contact/chat lists, so a filtered lookup scans flat strings instead of
+# lowercasing every field on every query; the comprehension fallback
+# covers lists cached before the columns existed.
+def _filter_contacts(
+    contacts: List[Dict[str, Any]],
+    index: Optional[Dict[str, List[str]]],
+    query: str,
+) -> List[Dict[str, Any]]:
+    """Filter contacts by a lowercased query on name or number."""
+    if index and len(index["name"]) == len(contacts):
+        names_lc = index["name"]
+        numbers_lc = index["number"]
+        return [
+            contacts[i]
+            for i, (name, number) in enumerate(zip(names_lc, numbers_lc))
+            if query in name or query in number
+        ]
+    _get = dict.get
+    return [
+        contact for contact in contacts
+        if query in _get(contact, "name", "").lower() or query in _get(contact, "number", "").lower()
+    ]
+
+
+def _filter_chats(
+    chats: List[Dict[str, Any]],
+    index: Optional[Dict[str, List[str]]],
+    query: str,
+) -> List[Dict[str, Any]]:
+    """Filter chats by a lowercased query on name."""
+    if index and len(index["name"]) == len(chats):
+        names_lc = index["name"]
+        return [chats[i] for i, name in enumerate(names_lc) if query in name]
+    _get = dict.get
+    return [
+        chat for chat in chats
+        if query in _get(chat, "name", "").lower()
+    ]
+
+
+async def _search_indexed(items, search, get_index, filter_fn, query):
+    """Run a query through the in-memory index with a persisted fallback.
+
+    Shared tail of get_contacts/get_chats: the casefolded in-memory
+    index is the fast path; lists loaded from disk before any write this
+    process fall back to the persisted lowercase columns.
+    """
+    q = query.lower()
+    matches = search(q)
+    if matches is not None:
+        return matches
+    return filter_fn(items, await get_index(), q)
+
+
+@lru_cache(maxsize=128)
+def _message_matcher(query: str):
+    """Build a matcher for a multi-token query, or None for single tokens.
+
+    Multi-word queries match messages containing any of the tokens via
+    one compiled alternation — a single C-level scan per message instead
+    of a Python loop over tokens. The LRU keeps the compiled pattern
+    across the repeated searches a conversation tends to produce.
+    """
+    tokens = query.split()
+    if len(tokens) > 1:
+        return re.compile("|".join(map(re.escape, tokens))).search
+    return None
+
+
+def _filter_messages(messages: List[Dict[str, Any]], query: str) -> List[Dict[str, Any]]:
+    """Filter messages by a lowercased query on content.
+
+    Prefers the _content_lc field stamped at ingest so cached messages
+    are scanned without re-lowercasing; messages cached before that
+    field existed fall back to lowering on the fly.
+    """
+    _get = dict.get
+    search = _message_matcher(query)
+    if search is not None:
+        return [
+            msg for msg in messages
+            if search(_get(msg, "_content_lc") or _get(msg, "content", "").lower())
+        ]
+    return [
+        msg for msg in messages
+        if query in (_get(msg, "_content_lc") or _get(msg, "content", "").lower())
+    ]
+
+
+def _public_messages(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Drop ingest-only fields before a message list leaves a tool.
+
+    _content_lc exists so repeated filters skip lower(); serializing it
+    back to the caller would roughly double text-heavy payloads. The
+    cached dicts stay stamped — only the response copies are cleaned.
+    """
+    return [
+        {k: v for k, v in msg.items() if k != "_content_lc"}
+        if "_content_lc" in msg else msg
+        for msg in messages
+    ]
+
+
+# Helper function to ensure connection
+async def ensure_connection() -> bool:
+    """Ensure connection to WhatsApp Gateway.
+
+    The supervisor task owns retries and backoff; this makes at most one
+    direct attempt so a tool call issued right after the gateway comes
+    up does not have to wait for the next backoff tick.
+    """
+    if gateway_client.is_connected():
+        return True
+
+    logger.warning("Not connected to WhatsApp Gateway. Attempting to connect...")
+    gateway_client.ensure_supervisor()
+    try:
+        await gateway_client.connect()
+    except Exception as e:
+        logger.error(f"Error connecting to WhatsApp Gateway: {e}")
+        return False
+    return gateway_client.is_connected()
+
+
+async def _refresh_contacts() -> Optional[List[Dict[str, Any]]]:
+    """Fetch contacts from the gateway and repopulate the cache."""
+    if not await ensure_connection():
+        logger.error("Failed to connect to WhatsApp Gateway. Cannot get contacts.")
+        return None
+
+    response = await _gw_send_command("getContacts")
+    if "data" in response and "contacts" in response["data"]:
+        contacts = response["data"]["contacts"]
+        await cache_manager.set_contacts(contacts)
+        return contacts
+    return None
+
+
+async def _refresh_chats() -> Optional[List[Dict[str, Any]]]:
+    """Fetch chats from the gateway and repopulate the cache."""
+    if not await ensure_connection():
+        logger.error("Failed to connect to WhatsApp Gateway. Cannot get chats.")
+        return None
+
+    response = await _gw_send_command("getChats")
+    if "data" in response and "chats" in response["data"]:
+        chats = response["data"]["chats"]
+        await cache_manager.set_chats(chats)
+        return chats
+    return None
+
+
+async def _refresh_chat_messages(chat_id: str, limit: int = 50) -> Optional[List[Dict[str, Any]]]:
+    """Fetch a chat's messages from the gateway and repopulate the cache."""
+    if not await ensure_connection():
+        logger.error("Failed to connect to WhatsApp Gateway. Cannot get chat messages.")
+        return None
+
+    response = await _gw_send_command(
+        "getChatMessages",
+        {"chatId": chat_id, "limit": limit}
+    )
+    if "data" in response and "messages" in response["data"]:
+        messages = response["data"]["messages"]
+
+        # Normalize once at ingest: lowercase content so every later
+        # filter scans the precomputed field instead of calling lower()
+        # per message per query, and guarantee a timestamp key so sort
+        # keys can use C-level itemgetter instead of a lambda
+        for msg in messages:
+            msg["_content_lc"] = msg.get("content", "").lower()
+            msg.setdefault("timestamp", "")
 
+        await cache_manager.set_chat_messages(chat_id, messages)
+        return messages
+    return None
 
 @mcp.tool()
 async def startup():
     """Initialize services on startup."""
     logger.info("Initializing WhatsApp MCP Server...")
-    
-    # Connect to WhatsApp Gateway with retry mechanism
-    connect_success = False
-    max_attempts = 5
-    
-    for attempt in range(1, max_attempts + 1):
-        try:
-            logger.info(f"Connecting to WhatsApp Gateway (attempt {attempt}/{max_attempts})...")
-            await gateway_client.connect()
-            
-            if gateway_client.is_connected():
-                connect_success = True
-                logger.info("Connected to WhatsApp Gateway successfully")
-                break
-            else:
-                logger.warning("Connection attempt completed but gateway not connected")
-                await asyncio.sleep(2)  # Short wait between attempts
-                
-        except Exception as e:
-            logger.warning(f"Could not connect to WhatsApp Gateway on attempt {attempt}: {e}")
-            await asyncio.sleep(2)  # Short wait between attempts
-    
-    if not connect_success:
+
+    # One direct attempt so the common case starts connected; the
+    # supervisor then owns reconnects with exponential backoff instead
+    # of this handler blocking on a fixed-interval retry loop
+    try:
+        await gateway_client.connect()
+    except Exception as e:
+        logger.warning(f"Could not connect to WhatsApp Gateway on startup: {e}")
+
+    gateway_client.ensure_supervisor()
+
+    if gateway_client.is_connected():
+        logger.info("Connected to WhatsApp Gateway successfully")
+    else:
         logger.warning("Could not establish connection to WhatsApp Gateway during startup")
         logger.info("Server will continue to run and retry connection in background")
-    
-    logger.info(f"WhatsApp MCP Server started")
+
+    logger.info("WhatsApp MCP Server started")
 
 
 @mcp.tool()
@@ -94,121 +314,111 @@ async def shutdown():
     logger.info("WhatsApp MCP Server shutdown complete")
 
 
+_ERROR_DEFAULT = object()
+
+def tool_error_boundary(default: Any = _ERROR_DEFAULT, log=logger):
+    """Catch-all boundary shared by the tool handlers.
+
+    Every tool used to wrap its whole body in the same try/except; one
+    decorator keeps the handler bodies small (which CPython 3.11's
+    specializing interpreter rewards) and the failure behavior uniform.
+    Without an explicit default, errors return the usual
+    {"success": False, "error": ...} dict.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await fn(*args, **kwargs)
+            except Exception as e:
+                log.exception(f"Error in {fn.__name__}: {e}")
+                if default is _ERROR_DEFAULT:
+                    return {"success": False, "error": str(e)}
+                return default
+        return wrapper
+    return decorator
+
+
 # Tools for WhatsApp integration
 
 @mcp.tool()
+@tool_error_boundary(default=[])
 async def get_contacts(query: Optional[str] = None) -> List[Dict[str, Any]]:
     """Get WhatsApp contacts, optionally filtered by query.
     
     Args:
         query: Optional search term to filter contacts by name or number
     """
-    try:
-        # Check cache first
-        cached_contacts = await cache_manager.get_contacts()
-        
-        if cached_contacts:
-            logger.debug("Returning contacts from cache")
-            
-            # Filter contacts if query is provided
-            if query and cached_contacts:
-                query = query.lower()
-                filtered_contacts = [
-                    contact for contact in cached_contacts
-                    if query in contact.get("name", "").lower() or query in contact.get("number", "").lower()
-                ]
-                return filtered_contacts
-            
-            return cached_contacts
-        
-        # Ensure connection to Gateway
-        if not await ensure_connection():
-            logger.error("Failed to connect to WhatsApp Gateway. Cannot get contacts.")
+    # Bind the hot globals once; the body then uses LOAD_FAST instead of
+    # a module-dict lookup per reference. Signature injection would leak
+    # extra parameters into the FastMCP tool schema, so locals it is.
+    cache = cache_manager
+    # Check cache first; stale entries still answer immediately
+    # while a background task refreshes them from the gateway. The
+    # sync peek avoids an event-loop hop on a memory hit
+    contacts = cache.peek_contacts()
+    if contacts is not None:
+        fresh = cache.is_fresh("contacts", _FRESH_FOR)
+    else:
+        contacts, fresh = await cache.get_swr("contacts", _FRESH_FOR)
+
+    if contacts:
+        logger.debug("Returning contacts from cache")
+        if not fresh:
+            _spawn_refresh("contacts", _refresh_contacts)
+    else:
+        contacts = await _refresh_contacts()
+        if not contacts:
             return []
-        
-        # Get contacts from WhatsApp Gateway
-        response = await gateway_client.send_command("getContacts")
-        
-        if "data" in response and "contacts" in response["data"]:
-            contacts = response["data"]["contacts"]
-            
-            # Cache contacts
-            await cache_manager.set_contacts(contacts)
-            
-            # Filter contacts if query is provided
-            if query:
-                query = query.lower()
-                filtered_contacts = [
-                    contact for contact in contacts
-                    if query in contact.get("name", "").lower() or query in contact.get("number", "").lower()
-                ]
-                return filtered_contacts
-            
-            return contacts
-        
-        return []
-    except Exception as e:
-        logger.exception(f"Error getting contacts: {e}")
-        return []
+
+    # Filter contacts if query is provided
+    if query:
+        return await _search_indexed(
+            contacts, cache.search_contacts, cache.get_contacts_index,
+            _filter_contacts, query,
+        )
+
+    return contacts
 
 
 @mcp.tool()
+@tool_error_boundary(default=[])
 async def get_chats(query: Optional[str] = None) -> List[Dict[str, Any]]:
     """Get WhatsApp chats, optionally filtered by query.
     
     Args:
         query: Optional search term to filter chats by name
     """
-    try:
-        # Check cache first
-        cached_chats = await cache_manager.get_chats()
-        
-        if cached_chats:
-            logger.debug("Returning chats from cache")
-            
-            # Filter chats if query is provided
-            if query and cached_chats:
-                query = query.lower()
-                filtered_chats = [
-                    chat for chat in cached_chats
-                    if query in chat.get("name", "").lower()
-                ]
-                return filtered_chats
-            
-            return cached_chats
-        
-        # Ensure connection to Gateway
-        if not await ensure_connection():
-            logger.error("Failed to connect to WhatsApp Gateway. Cannot get chats.")
+    cache = cache_manager
+    # Check cache first; stale entries refresh in the background.
+    # The sync peek avoids an event-loop hop on a memory hit
+    chats = cache.peek_chats()
+    if chats is not None:
+        fresh = cache.is_fresh("chats", _FRESH_FOR)
+    else:
+        chats, fresh = await cache.get_swr("chats", _FRESH_FOR)
+
+    if chats:
+        logger.debug("Returning chats from cache")
+        if not fresh:
+            _spawn_refresh("chats", _refresh_chats)
+    else:
+        chats = await _refresh_chats()
+        if not chats:
             return []
-        
-        # Get chats from WhatsApp Gateway
-        response = await gateway_client.send_command("getChats")
-        
-        if "data" in response and "chats" in response["data"]:
-            chats = response["data"]["chats"]
-            
-            # Cache chats
-            await cache_manager.set_chats(chats)
-            
-            # Filter chats if query is provided
-            if query:
-                query = query.lower()
-                filtered_chats = [
-                    chat for chat in chats
-                    if query in chat.get("name", "").lower()
-                ]
-                return filtered_chats
-            
-            return chats
-        
-        return []
-    except Exception as e:
-        logger.exception(f"Error getting chats: {e}")
-        return []
+
+    # Filter chats if query is provided
+    if query:
+        return await _search_indexed(
+            chats, cache.search_chats, cache.get_chats_index,
+            _filter_chats, query,
+        )
+
+    return chats
 
 
 @mcp.tool()
+@tool_error_boundary(default=[])
 async def get_chat_messages(
     chat_id: str,
     limit: int = 50,
@@ -221,63 +431,33 @@ async def get_chat_messages(
         limit: Maximum number of messages to return
         query: Optional search term to filter messages by content
     """
-    try:
-        if not chat_id:
-            logger.error("No chat_id provided")
-            return []
-        
-        # Check cache first
-        cached_messages = await cache_manager.get_chat_messages(chat_id)
-        
-        if cached_messages:
-            logger.debug(f"Returning messages for chat {chat_id} from cache")
-            
-            # Filter messages if query is provided
-            if query:
-                query = query.lower()
-                filtered_messages = [
-                    msg for msg in cached_messages
-                    if query in msg.get("content", "").lower()
-                ]
-                return filtered_messages[:limit]
-            
-            return cached_messages[:limit]
-        
-        # Ensure connection to Gateway
-        if not await ensure_connection():
-            logger.error("Failed to connect to WhatsApp Gateway. Cannot get chat messages.")
-            return []
-        
-        # Get messages from WhatsApp Gateway
-        response = await gateway_client.send_command(
-            "getChatMessages",
-            {"chatId": chat_id, "limit": limit}
-        )
-        
-        if "data" in response and "messages" in response["data"]:
-            messages = response["data"]["messages"]
-            
-            # Cache messages
-            await cache_manager.set_chat_messages(chat_id, messages)
-            
-            # Filter messages if query is provided
-            if query:
-                query = query.lower()
-                filtered_messages = [
-                    msg for msg in messages
-                    if query in msg.get("content", "").lower()
-                ]
-                return filtered_messages
-            
-            return messages
-        
-        return []
-    except Exception as e:
-        logger.exception(f"Error getting chat messages: {e}")
+    cache = cache_manager
+    if not chat_id:
+        logger.error("No chat_id provided")
         return []
 
+    # Check cache first; stale entries refresh in the background
+    key = f"chat_messages:{chat_id}"
+    messages, fresh = await cache.get_chat_messages_swr(chat_id, _FRESH_FOR)
+
+    if messages:
+        logger.debug(f"Returning messages for chat {chat_id} from cache")
+        if not fresh:
+            _spawn_refresh(key, lambda: _refresh_chat_messages(chat_id, limit))
+    else:
+        messages = await _refresh_chat_messages(chat_id, limit)
+        if not messages:
+            return []
+
+    # Filter messages if query is provided
+    if query:
+        return _public_messages(_filter_messages(messages, query.lower())[:limit])
+
+    return _public_messages(messages[:limit])
+
 
 @mcp.tool()
+@tool_error_boundary()
 async def send_message(
     chat_id: str,
     content: str
@@ -288,133 +468,147 @@ async def send_message(
         chat_id: ID of the chat to send message to
         content: Content of the message to send
     """
-    try:
-        if not chat_id or not content:
-            logger.error("Missing chat_id or content")
-            return {"success": False, "error": "Missing chat_id or content"}
-        
-        # Ensure connection to Gateway
-        if not await ensure_connection():
-            logger.error("Failed to connect to WhatsApp Gateway. Cannot send message.")
-            return {"success": False, "error": "Failed to connect to WhatsApp Gateway"}
-        
-        # Send message to WhatsApp Gateway
-        response = await gateway_client.send_command(
-            "sendMessage",
-            {"chatId": chat_id, "content": content}
-        )
+    if not chat_id or not content:
+        logger.error("Missing chat_id or content")
+        return _ERR_MISSING_MESSAGE_ARGS
+    
+    # Ensure connection to Gateway
+    if not await ensure_connection():
+        logger.error("Failed to connect to WhatsApp Gateway. Cannot send message.")
+        return _ERR_NOT_CONNECTED
+    
+    # Send message to WhatsApp Gateway
+    response = await _gw_send_command(
+        "sendMessage",
+        {"chatId": chat_id, "content": content}
+    )
+    
+    if "data" in response and "message" in response["data"]:
+        sent_message = response["data"]["message"]
         
-        if "data" in response and "message" in response["data"]:
-            sent_message = response["data"]["message"]
-            
-            # Add to cache
-            chat_id = sent_message.get("chatId")
-            if chat_id:
-                await cache_manager.add_chat_message(chat_id, sent_message)
-            
-            return {"success": True, "message": sent_message}
+        # Add to cache
+        chat_id = sent_message.get("chatId")
+        if chat_id:
+            await _cm_add_chat_message(chat_id, sent_message)
         
-        return {"success": False, "error": "Failed to send message"}
-    except Exception as e:
-        logger.exception(f"Error sending message: {e}")
-        return {"success": False, "error": str(e)}
+        return {"success": True, "message": sent_message}
+    
+    return _ERR_SEND_FAILED
 
 
 @mcp.tool()
+@tool_error_boundary(log=media_log)
 async def send_media(
     chat_id: str,
-    media: str,  # Base64 encoded media
-    filename: str,
+    media: Optional[str] = None,  # Base64 encoded media
+    filename: str = "",
     caption: Optional[str] = None,
-    media_type: Optional[str] = None
+    media_type: Optional[str] = None,
+    media_path: Optional[str] = None
 ) -> Dict[str, Any]:
     """Send media to a WhatsApp chat.
-    
+
     Args:
         chat_id: ID of the chat to send media to
-        media: Base64 encoded media content
+        media: Base64 encoded media content (omit when media_path is set)
         filename: Name of the media file
         caption: Optional caption for the media
         media_type: Optional type of media (image, video, audio, document)
+        media_path: Optional local file to send instead of inline base64
     """
+    if not chat_id or not filename or not (media or media_path):
+        logger.error("Missing required parameters")
+        return _ERR_MISSING_MEDIA_ARGS
+
+    # Reject bad media types before connecting or reading the file:
+    # the gateway would refuse them anyway, so failing here saves
+    # the whole round-trip on user error
+    if media_type and media_type not in _VALID_MEDIA_TYPES:
+        media_log.error("Invalid media type: {}", media_type)
+        return {
+            "success": False,
+            "error": f"Invalid media type: {media_type}. "
+                     f"Must be one of: image, video, audio, document",
+        }
+
+    # Ensure connection to Gateway
+    if not await ensure_connection():
+        media_log.error("Failed to connect to WhatsApp Gateway. Cannot send media.")
+        return _ERR_NOT_CONNECTED
+
+    # A local path skips shipping megabytes of base64 through the
+    # tool call; the file is read off-loop and encoded once here.
+    # (The gateway protocol stays JSON, so base64 on the wire.)
+    if media_path and not media:
+        try:
+            raw = await asyncio.to_thread(Path(media_path).read_bytes)
+        except OSError as e:
+            media_log.error("Cannot read media file {}: {}", media_path, e)
+            return {"success": False, "error": f"Cannot read media file: {e}"}
+        media = base64.b64encode(raw).decode("ascii")
+
+    # Base64 inflates by 4/3, so the decoded size is len * 3 / 4 —
+    # shifts only, no float math on a multi-MB string
+    approx_bytes = (len(media) * 3) >> 2
+    media_size_kb = approx_bytes >> 10
+    media_log.info("Sending media to chat {}: filename={}, size={}KB, type={}", chat_id, filename, media_size_kb, media_type)
+
+    # Size verification
+    MAX_SIZE_BYTES = 5000 << 10  # 5MB decoded
+    if approx_bytes > MAX_SIZE_BYTES:
+        media_log.warning("Large media being sent: {}KB. May cause timeout issues.", media_size_kb)
+
+    # Calculate appropriate timeout based on media size (min 2
+    # minutes, max 10 minutes); >> 13 approximates KB // 10
+    dynamic_timeout = min(600, max(120, approx_bytes >> 13))
+    media_log.debug("Using timeout of {} seconds for media send", dynamic_timeout)
+
+    # Send media to WhatsApp Gateway with dynamic timeout
     try:
-        if not chat_id or not media or not filename:
-            logger.error("Missing required parameters")
-            return {"success": False, "error": "Missing required parameters"}
-        
-        # Ensure connection to Gateway
-        if not await ensure_connection():
-            logger.error("[MEDIA] Failed to connect to WhatsApp Gateway. Cannot send media.")
-            return {"success": False, "error": "Failed to connect to WhatsApp Gateway"}
-        
-        # Calculate media size
-        media_size_kb = len(media) / 1024
-        logger.info(f"[MEDIA] Sending media to chat {chat_id}: filename={filename}, size={media_size_kb:.2f}KB, type={media_type}")
-        
-        # Size verification
-        MAX_SIZE_KB = 5000  # 5MB in Base64
-        if media_size_kb > MAX_SIZE_KB:
-            logger.warning(f"[MEDIA] Large media being sent: {media_size_kb:.2f}KB. May cause timeout issues.")
-        
-        # Validate media type
-        valid_types = ["image", "video", "audio", "document"]
-        if media_type and media_type not in valid_types:
-            logger.warning(f"[MEDIA] Potentially invalid media type: {media_type}")
+        response = await _gw_send_command(
+            "sendMedia",
+            {
+                "chatId": chat_id,
+                "media": media,
+                "filename": filename,
+                "caption": caption,
+                "mediaType": media_type
+            },
+            timeout=dynamic_timeout
+        )
         
-        # Calculate appropriate timeout based on media size (min 2 minutes, max 10 minutes)
-        dynamic_timeout = min(600, max(120, int(media_size_kb / 10)))
-        logger.info(f"[MEDIA] Using timeout of {dynamic_timeout} seconds for media send")
+        media_log.opt(lazy=True).debug("Gateway response received: success={}", lambda: response.get('success', False))
         
-        logger.info(f"[MEDIA] Calling gateway sendMedia command")
+        if "error" in response:
+            media_log.error("Gateway error: {}", response["error"])
+            return {"success": False, "error": response["error"]}
         
-        # Send media to WhatsApp Gateway with dynamic timeout
-        try:
-            response = await gateway_client.send_command(
-                "sendMedia",
-                {
-                    "chatId": chat_id,
-                    "media": media,
-                    "filename": filename,
-                    "caption": caption,
-                    "mediaType": media_type
-                },
-                timeout=dynamic_timeout
-            )
-            
-            logger.info(f"[MEDIA] Gateway response received: success={response.get('success', False)}")
-            
-            if "error" in response:
-                logger.error(f"[MEDIA] Gateway error: {response['error']}")
-                return {"success": False, "error": response["error"]}
+        if "data" in response and "message" in response["data"]:
+            sent_message = response["data"]["message"]
             
-            if "data" in response and "message" in response["data"]:
-                sent_message = response["data"]["message"]
-                
-                # Add to cache
-                chat_id = sent_message.get("chatId")
-                if chat_id:
-                    await cache_manager.add_chat_message(chat_id, sent_message)
-                
-                logger.info(f"[MEDIA] Media successfully sent and cached")
-                return {"success": True, "message": sent_message}
+            # Add to cache
+            chat_id = sent_message.get("chatId")
+            if chat_id:
+                await _cm_add_chat_message(chat_id, sent_message)
             
-            logger.error(f"[MEDIA] Unexpected response format: {response}")
-            return {"success": False, "error": "Failed to send media: Unexpected response format"}
-        
-        except asyncio.TimeoutError:
-            logger.error(f"[MEDIA] Operation timed out after {dynamic_timeout} seconds")
-            return {"success": False, "error": f"Media send operation timed out after {dynamic_timeout} seconds"}
-        
-        except Exception as cmd_error:
-            logger.error(f"[MEDIA] Error during gateway command: {cmd_error}")
-            return {"success": False, "error": f"Error communicating with Gateway: {str(cmd_error)}"}
+            media_log.debug("Media successfully sent and cached")
+            return {"success": True, "message": sent_message}
         
-    except Exception as e:
-        logger.exception(f"[MEDIA] Unhandled exception in send_media: {e}")
-        return {"success": False, "error": str(e)}
+        media_log.error("Unexpected response format: {}", response)
+        return _ERR_MEDIA_BAD_RESPONSE
+    
+    except TimeoutError:
+        media_log.error("Operation timed out after {} seconds", dynamic_timeout)
+        return {"success": False, "error": f"Media send operation timed out after {dynamic_timeout} seconds"}
+    
+    except Exception as cmd_error:
+        media_log.error("Error during gateway command: {}", cmd_error)
+        return {"success": False, "error": f"Error communicating with Gateway: {str(cmd_error)}"}
+    
 
 
 @mcp.tool()
+@tool_error_boundary(default=[])
 async def search_messages(
     query: str,
     chat_id: Optional[str] = None,
@@ -427,55 +621,110 @@ async def search_messages(
         chat_id: Optional chat ID to limit search to a specific chat
         limit: Maximum number of messages to return
     """
-    try:
-        if not query:
-            logger.error("No query provided")
-            return []
-        
-        # Ensure connection to Gateway
-        if not await ensure_connection():
-            logger.error("Failed to connect to WhatsApp Gateway. Cannot search messages.")
-            return []
-        
-        query = query.lower()
-        results = []
-        
-        # Search in specific chat if chat_id is provided
-        if chat_id:
-            messages = await get_chat_messages(chat_id, limit, query)
-            return messages
-        
-        # Search in all chats
+    if not query:
+        logger.error("No query provided")
+        return []
+    
+    # Ensure connection to Gateway
+    if not await ensure_connection():
+        logger.error("Failed to connect to WhatsApp Gateway. Cannot search messages.")
+        return []
+    
+    # Push the search down to the gateway when it supports it:
+    # whatsapp-web.js searches server-side, so matching messages are
+    # the only ones that cross the wire. Older gateways answer with
+    # an unknown-command error, which drops us into the fan-out.
+    global _gateway_search_unsupported
+    if not _gateway_search_unsupported:
+        try:
+            response = await _gw_send_command(
+                "searchMessages",
+                {"query": query, "chatId": chat_id, "limit": limit},
+            )
+            if "data" in response and "messages" in response["data"]:
+                return response["data"]["messages"]
+        except (ConnectionError, TimeoutError) as e:
+            # Transient failure, not a capability miss; probe again next time
+            logger.debug(f"Gateway searchMessages failed, using fan-out: {e}")
+        except Exception as e:
+            _gateway_search_unsupported = True
+            logger.debug(f"Gateway searchMessages unavailable, using fan-out: {e}")
+
+    query = query.lower()
+
+    # Search in specific chat if chat_id is provided
+    if chat_id:
+        messages = await get_chat_messages(chat_id, limit, query)
+        return messages
+
+    # Search in all chats; the precomputed id list skips the full
+    # get_chats round-trip when the cache is warm
+    ids = cache_manager.peek_chat_ids()
+    if ids is None:
         chats = await get_chats()
-        
-        for chat in chats[:10]:  # Limit to 10 chats for performance
-            chat_id = chat.get("id")
-            if chat_id:
-                messages = await get_chat_messages(chat_id, limit // 10, query)  # Distribute limit among chats
-                results.extend(messages)
-        
-        # Sort results by timestamp (newest first)
-        results.sort(key=lambda m: m.get("timestamp", ""), reverse=True)
-        
-        return results[:limit]
-    except Exception as e:
-        logger.exception(f"Error searching messages: {e}")
+        ids = [chat["id"] for chat in chats if chat.get("id")]
+
+    # Fan out concurrently: each per-chat search is a gateway
+    # round-trip, so issuing them together makes the latency the
+    # slowest chat instead of the sum of all of them
+    ids = ids[:10]  # Limit to 10 chats for performance
+    if not ids:
         return []
 
+    # Split the result budget evenly with a floor of one, and cap
+    # concurrency so a wide search can't monopolize the gateway
+    per_limit = max(1, limit // len(ids))
+    semaphore = asyncio.Semaphore(5)
+
+    async def _search_chat(search_chat_id: str) -> List[Dict[str, Any]]:
+        async with semaphore:
+            return await get_chat_messages(search_chat_id, per_limit, query)
+
+    per_chat = await asyncio.gather(*(_search_chat(cid) for cid in ids), return_exceptions=True)
+    results = [msg for messages in per_chat if isinstance(messages, list) for msg in messages]
+
+    # Newest `limit` messages; nlargest is O(n log k) where a full
+    # sort pays O(n log n) just to throw most of it away. itemgetter
+    # is safe here because ingest guarantees the timestamp key
+    return heapq.nlargest(limit, results, key=itemgetter("timestamp"))
+
+
+async def _cleanup() -> None:
+    """Release cache resources on shutdown.
+
+    Runs on a fresh loop after FastMCP's has closed, so the gateway
+    websocket (bound to the dead loop) cannot be awaited here —
+    disconnect() would raise on every shutdown. The client state is
+    torn down synchronously and the socket falls to process exit; what
+    actually needs flushing is diskcache's SQLite state.
+    """
+    gateway_client.abort()
+    try:
+        await cache_manager.close()
+    except Exception as e:
+        logger.warning(f"Error closing cache during shutdown: {e}")
+
 
 def main():
     """Entry point for the application."""
-    # Setup signal handlers
+    # SIGINT/SIGTERM raise SystemExit, which unwinds mcp.run() and lands
+    # in the finally below. loop.add_signal_handler is not an option
+    # here: FastMCP owns the event loop and only creates it inside run()
     def signal_handler(sig, frame):
         logger.info(f"Received signal {sig}, shutting down...")
         sys.exit(0)
-    
+
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
-    
+
     # Run the MCP server
     logger.info("Starting WhatsApp MCP Server...")
+    try:
+        mcp.run(transport='stdio')
+    finally:
+        # FastMCP's loop is gone by now; run cleanup on a fresh one
+        asyncio.run(_cleanup())
 
 
 if __name__ == "__main__":
-    mcp.run(transport='stdio')
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -5,8 +5,9 @@ Configuration module for the MCP WhatsApp Server.
 """
 
 import os
-import json
+import orjson
 from pathlib import Path
+from functools import lru_cache
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
@@ -36,6 +37,7 @@ class Config(BaseModel):
     # Cache configuration
     cache_dir: str = Field(default="./cache")
     cache_ttl: int = Field(default=86400)  # 24 hours in seconds
+    redis_url: Optional[str] = Field(default=None)  # Shared cache across replicas
     
     # Media configuration
     media_dir: str = Field(default="./media")
@@ -52,16 +54,21 @@ class Config(BaseModel):
         # Allow extra fields in the config file
         extra = "allow"
 
+@lru_cache(maxsize=4)
 def load_config(config_path: Optional[str] = None) -> Config:
-    """Load configuration from environment variables and config file."""
-    
+    """Load configuration from environment variables and config file.
+
+    Memoized per config_path: re-imports and helper calls reuse the
+    already-parsed Config instead of re-reading the files and re-running
+    the mkdir calls (both of which are idempotent anyway).
+    """
+
     # Try to load from config file if provided
     config_data: Dict[str, Any] = {}
     if config_path:
         config_file = Path(config_path)
         if config_file.exists():
-            with open(config_file, "r") as f:
-                config_data = json.load(f)
+            config_data = orjson.loads(config_file.read_bytes())
     
     # Check for claude desktop config
     claude_config_path = os.environ.get("CLAUDE_CONFIG_PATH", "")
@@ -69,9 +76,9 @@ def load_config(config_path: Optional[str] = None) -> Config:
         claude_config_file = Path(claude_config_path)
         if claude_config_file.exists():
             try:
-                with open(claude_config_file, "r") as f:
-                    claude_config = json.load(f)
-                    
+                claude_config = orjson.loads(claude_config_file.read_bytes())
+
+
                 # Extract WhatsApp plugin configuration
                 if "mcp" in claude_config and "plugins" in claude_config["mcp"]:
                     for plugin in claude_config["mcp"]["plugins"]:
@@ -87,7 +94,7 @@ def load_config(config_path: Optional[str] = None) -> Config:
                                     config_data["cache_dir"] = settings["cacheDirectory"]
                                 if "cacheTTL" in settings:
                                     config_data["cache_ttl"] = settings["cacheTTL"]
-            except (json.JSONDecodeError, IOError) as e:
+            except (orjson.JSONDecodeError, IOError) as e:
                 print(f"Error loading Claude config: {e}")
     
     # Create configuration, environment variables will override config file values
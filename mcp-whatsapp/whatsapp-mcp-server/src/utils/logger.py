@@ -15,12 +15,17 @@ logger.remove()
 # Determine log level from environment variable
 log_level = os.environ.get("MCP_LOG_LEVEL", "INFO").upper()
 
-# Set up console logging
+# Set up console logging; only pay for ANSI markup when stderr is an
+# actual terminal (Claude Desktop launches pipe it to a file)
 logger.add(
     sys.stderr,
     format="<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
     level=log_level,
-    colorize=True,
+    colorize=sys.stderr.isatty(),
+    enqueue=True,  # Hand writes to a background thread; a slow stderr
+    # consumer must not stall the event loop
+    backtrace=False,
+    diagnose=False,
 )
 
 # Create logs directory if it doesn't exist
@@ -35,8 +40,16 @@ logger.add(
     rotation="10 MB",  # Rotate when file reaches 10MB
     compression="zip",  # Compress rotated files
     retention="1 week",  # Keep logs for 1 week
+    enqueue=True,  # Rotation + zip of a 10MB file would otherwise block
+    # the asyncio loop for the duration of the compression
+    backtrace=False,
+    diagnose=False,
 )
 
+# Bound logger for the media hot path: the subsys field replaces the
+# old "[MEDIA]" message prefixes without re-formatting per call
+media_log = logger.bind(subsys="media")
+
 def get_logger(name):
     """Get a logger with the given name."""
     return logger.bind(name=name)
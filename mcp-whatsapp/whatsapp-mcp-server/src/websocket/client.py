@@ -4,15 +4,68 @@ WebSocket client for communicating with the WhatsApp Gateway.
 @author Bruno Santos
 """
 
-import json
+import re
+import heapq
+import random
 import asyncio
-import uuid
+import orjson
+from contextlib import asynccontextmanager
 from typing import Dict, Any, Optional, Callable, List, Set, Coroutine
 import websockets
 from websockets.exceptions import ConnectionClosed, WebSocketException
 
 from ..utils.logger import logger
 
+# Read-only commands whose identical concurrent calls can share one
+# gateway round-trip. Mutating commands (sendMessage, sendMedia) must
+# never coalesce: each call is its own side effect.
+# Hand-assembled command envelope: the frame shape never changes, so
+# the fixed parts are pre-encoded bytes and only the data payload runs
+# through orjson. Both interpolated tokens must be JSON-safe verbatim
+# (no quotes, backslashes, or control chars) — anything that fails the
+# check takes the generic encoder instead.
+_SAFE_TOKEN = re.compile(r"[A-Za-z0-9_\-]+\Z").match
+_CMD_PREFIX = b'{"type":"command","id":"'
+_CMD_MID1 = b'","command":"'
+_CMD_MID2 = b'","data":'
+_CMD_SUFFIX = b',"timestamp":null}'
+
+_COALESCABLE_COMMANDS = frozenset({
+    "getContacts",
+    "getChats",
+    "getChatMessages",
+    "getQRCode",
+    "searchMessages",
+})
+
+class CommandPipeline:
+    """Batch of commands issued concurrently over one connection.
+
+    Each send() starts the command immediately and returns its future,
+    so all frames go out without waiting for earlier responses — the
+    batch costs one round-trip instead of one per command.
+    """
+
+    def __init__(self, client: "WhatsAppGatewayClient"):
+        self._client = client
+        self._futures: List[asyncio.Future] = []
+
+    def send(
+        self,
+        command: str,
+        data: Optional[Dict[str, Any]] = None,
+        timeout: int = 30,
+    ) -> asyncio.Future:
+        """Issue a command and return a future for its response."""
+        future = asyncio.ensure_future(self._client.send_command(command, data, timeout))
+        self._futures.append(future)
+        return future
+
+    async def drain(self) -> None:
+        """Wait for every command in the pipeline to settle."""
+        if self._futures:
+            await asyncio.gather(*self._futures, return_exceptions=True)
+
 class WhatsAppGatewayClient:
     """WebSocket client for communicating with the WhatsApp Gateway."""
     
@@ -30,11 +83,42 @@ class WhatsAppGatewayClient:
         self.websocket = None
         self.connected = False
         self.authenticated = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
         self.reconnect_task = None
         self.receive_task = None
+        self.send_task = None
+        self._closed = False
+
+        # Outbound frames funnel through one queue so commands issued
+        # back-to-back coalesce into a single batch frame (see
+        # _send_frames) instead of paying per-frame WS/TCP overhead
+        self._send_queue: asyncio.Queue = asyncio.Queue()
         
-        # Command tracking
+        # Command tracking; ids come from a plain per-client counter —
+        # they only correlate request/response on this connection, so
+        # uuid4's getrandom() syscall and 36-char format were pure waste
         self.pending_commands: Dict[str, asyncio.Future] = {}
+        self._cmd_seq = 0
+
+        # Command deadlines as a (when, id, command) heap serviced by
+        # one reaper task, instead of a TimerHandle plus wrapper Task
+        # per command via wait_for
+        self._deadlines: list = []
+        self._reaper_task = None
+
+        # Lazily built per-command timeout messages; during an outage
+        # the same few commands time out over and over, so the format
+        # work happens once per command name
+        self._timeout_msgs: Dict[str, str] = {}
+
+        # Single-flight tracking: identical read commands in flight at
+        # the same time share one task instead of hitting the gateway N
+        # times (e.g. burst get_chats calls during startup warm-up)
+        self._inflight: Dict[Any, asyncio.Task] = {}
+
+        # Cap concurrent gateway round-trips: bursty tool calls fanning
+        # out otherwise head-of-line block the single websocket
+        self._sem = asyncio.Semaphore(16)
         
         # Event handlers
         self.event_handlers: Dict[str, List[Callable]] = {}
@@ -45,13 +129,33 @@ class WhatsAppGatewayClient:
         
         # Create tasks set to keep track of running tasks
         self.tasks: Set[asyncio.Task] = set()
+
+        # Per-frame dispatch table: one dict lookup on the interned type
+        # string instead of an if/elif chain of string compares
+        self._msg_dispatch = {
+            "response": self._on_response,
+            "error": self._on_error,
+            "event": self._on_event,
+        }
     
+    def _spawn(self, coro) -> asyncio.Task:
+        """Create a tracked background task.
+
+        The set keeps a strong reference so the loop cannot drop a
+        running task; the done callback removes it on completion.
+        """
+        task = asyncio.create_task(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return task
+
     async def connect(self) -> bool:
         """Connect to the WhatsApp Gateway."""
         if self.connected:
             return True
         
         try:
+            self._loop = asyncio.get_running_loop()
             logger.info(f"Connecting to WhatsApp Gateway at {self.ws_url}")
             # Using websockets library directly
             self.websocket = await websockets.connect(
@@ -62,38 +166,29 @@ class WhatsAppGatewayClient:
             )
             self.connected = True
             
-            # Start message receiver task
-            self.receive_task = asyncio.create_task(self._receive_messages())
-            self.tasks.add(self.receive_task)
-            self.receive_task.add_done_callback(self.tasks.discard)
+            # Start message receiver plus, on the first connect, the
+            # connection-independent sender and reaper tasks
+            self.receive_task = self._spawn(self._receive_messages())
+            if not self.send_task or self.send_task.done():
+                self.send_task = self._spawn(self._send_frames())
+            if not self._reaper_task or self._reaper_task.done():
+                self._reaper_task = self._spawn(self._reap_timeouts())
             
             # Notify connection callbacks
-            for callback in self.on_connect_callbacks:
-                try:
-                    if asyncio.iscoroutinefunction(callback):
-                        await callback()
-                    else:
-                        callback()
-                except Exception as e:
-                    logger.error(f"Error in connect callback: {e}")
-            
+            await self._run_callbacks(self.on_connect_callbacks, "connect")
+
             logger.info("Connected to WhatsApp Gateway")
             return True
         except (WebSocketException, OSError) as e:
             logger.error(f"Failed to connect to WhatsApp Gateway: {e}")
             self.connected = False
-            
-            # Start reconnection task if not already running
-            if not self.reconnect_task or self.reconnect_task.done():
-                self.reconnect_task = asyncio.create_task(self._reconnect())
-                self.tasks.add(self.reconnect_task)
-                self.reconnect_task.add_done_callback(self.tasks.discard)
-            
+            self.ensure_supervisor()
             return False
     
     async def disconnect(self) -> None:
         """Disconnect from the WhatsApp Gateway."""
         self.connected = False
+        self._closed = True  # Stop the supervisor from reconnecting
         
         # Cancel running tasks
         for task in self.tasks:
@@ -105,17 +200,22 @@ class WhatsAppGatewayClient:
             self.websocket = None
         
         # Notify disconnection callbacks
-        for callback in self.on_disconnect_callbacks:
-            try:
-                if asyncio.iscoroutinefunction(callback):
-                    await callback()
-                else:
-                    callback()
-            except Exception as e:
-                logger.error(f"Error in disconnect callback: {e}")
+        await self._run_callbacks(self.on_disconnect_callbacks, "disconnect")
         
         logger.info("Disconnected from WhatsApp Gateway")
     
+    def abort(self) -> None:
+        """Drop the connection state without touching the event loop.
+
+        For shutdown paths that run after the loop the client lived on
+        is gone: disconnect() would await the dead loop's websocket and
+        raise. No close frame goes out; process exit drops the socket.
+        """
+        self._closed = True
+        self.connected = False
+        self.authenticated = False
+        self.websocket = None
+
     def is_connected(self) -> bool:
         """Check if the client is connected to the WhatsApp Gateway."""
         return self.connected and self.websocket is not None
@@ -129,110 +229,318 @@ class WhatsAppGatewayClient:
         command: str,
         data: Optional[Dict[str, Any]] = None,
         timeout: int = 30,
-    ) -> Dict[str, Any]:
-        """Send a command to the WhatsApp Gateway and wait for the response."""
-        if not self.is_connected():
+        fire_and_forget: bool = False,
+    ) -> Optional[Dict[str, Any]]:
+        """Send a command to the WhatsApp Gateway and wait for the response.
+
+        Identical read commands already in flight are coalesced: later
+        callers await the first call's task and share its response.
+        With fire_and_forget=True the command is queued without a
+        response future and None is returned immediately.
+        """
+        if fire_and_forget or command not in _COALESCABLE_COMMANDS:
+            return await self._send_command(command, data, timeout, fire_and_forget)
+
+        # Sorted-key encoding makes the key stable across dict orderings
+        key = (command, orjson.dumps(data or {}, option=orjson.OPT_SORT_KEYS))
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await inflight
+
+        task = asyncio.ensure_future(self._send_command(command, data, timeout))
+        self._inflight[key] = task
+        try:
+            return await task
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _send_command(
+        self,
+        command: str,
+        data: Optional[Dict[str, Any]] = None,
+        timeout: int = 30,
+        fire_and_forget: bool = False,
+    ) -> Optional[Dict[str, Any]]:
+        """Send a single command over the websocket and await its response."""
+        # Inline the is_connected() check: two attribute loads instead
+        # of a method call on every command
+        if not (self.connected and self.websocket is not None):
             raise ConnectionError("Not connected to WhatsApp Gateway")
-        
-        # Generate command ID
-        command_id = str(uuid.uuid4())
-        
-        # Create message
-        message = {
-            "type": "command",
-            "id": command_id,
-            "command": command,
-            "data": data or {},
-            "timestamp": None,  # Server will set this
-        }
-        
-        # Create future for response
+
+        # Generate command ID (kept a string: the wire protocol and the
+        # gateway's response echo both treat ids as strings)
+        self._cmd_seq += 1
+        command_id = f"{self._cmd_seq:x}"
+
+        # Build the frame: splice the two tokens and the encoded data
+        # into the static template, skipping the envelope dict and the
+        # generic JSON walk over its fixed keys
+        if _SAFE_TOKEN(command) and _SAFE_TOKEN(command_id):
+            payload = b"".join((
+                _CMD_PREFIX, command_id.encode(), _CMD_MID1, command.encode(),
+                _CMD_MID2, orjson.dumps(data or {}), _CMD_SUFFIX,
+            ))
+        else:
+            payload = orjson.dumps({
+                "type": "command",
+                "id": command_id,
+                "command": command,
+                "data": data or {},
+                "timestamp": None,  # Server will set this
+            })
+
+        # Callers that don't need the response skip the whole Future /
+        # pending-registration / timeout machinery
+        if fire_and_forget:
+            self._send_queue.put_nowait(payload)
+            return None
+
+        # Create future for response; the done callback is the single
+        # cleanup point for the pending map, however the future settles
         future = asyncio.Future()
+        future._cmd_id = command_id
+        future.add_done_callback(self._discard_pending)
         self.pending_commands[command_id] = future
         
         try:
-            # Send command
-            await self.websocket.send(json.dumps(message))
-            
-            # Wait for response with timeout
-            return await asyncio.wait_for(future, timeout)
-        except asyncio.TimeoutError:
+            async with self._sem:
+                # Queue the frame; the sender task batches commands
+                # issued back-to-back into one websocket frame
+                self._send_queue.put_nowait(payload)
+
+                # Register the deadline with the shared reaper and wait;
+                # awaiting the bare future skips the wrapper Task and
+                # TimerHandle that wait_for schedules per call
+                heapq.heappush(
+                    self._deadlines, (self._loop.time() + timeout, command_id, command)
+                )
+                return await future
+        except TimeoutError:
             logger.error(f"Command {command} timed out after {timeout} seconds")
-            self.pending_commands.pop(command_id, None)
-            raise TimeoutError(f"Command {command} timed out")
+            raise
         except WebSocketException as e:
             logger.error(f"WebSocket error sending command {command}: {e}")
-            self.pending_commands.pop(command_id, None)
             raise ConnectionError(f"WebSocket error: {str(e)}")
         except Exception as e:
             logger.error(f"Error sending command {command}: {e}")
-            self.pending_commands.pop(command_id, None)
             raise
+        finally:
+            # Cancellation is the one way out that doesn't settle the
+            # future through set_result/set_exception
+            if not future.done():
+                future.cancel()
     
+    @asynccontextmanager
+    async def pipeline(self):
+        """Run several commands concurrently over the connection.
+
+        Usage:
+            async with client.pipeline() as pipe:
+                futures = [pipe.send("getChatMessages", {...}) for ...]
+            results = [f.result() for f in futures]
+
+        The context exit waits for all pipelined commands to settle, so
+        futures are safe to inspect afterwards.
+        """
+        pipe = CommandPipeline(self)
+        try:
+            yield pipe
+        finally:
+            await pipe.drain()
+
     def register_event_handler(self, event: str, handler: Callable) -> None:
-        """Register a handler for a specific event."""
+        """Register a handler for a specific event.
+
+        Coroutine-ness is probed once here, so dispatch never pays the
+        inspect-module reflection per event.
+        """
         if event not in self.event_handlers:
             self.event_handlers[event] = []
-        
-        self.event_handlers[event].append(handler)
-    
+
+        is_coro = asyncio.iscoroutinefunction(handler)
+        self.event_handlers[event].append((handler, is_coro))
+
     def unregister_event_handler(self, event: str, handler: Callable) -> None:
         """Unregister a handler for a specific event."""
-        if event in self.event_handlers:
-            try:
-                self.event_handlers[event].remove(handler)
-            except ValueError:
-                pass
+        handlers = self.event_handlers.get(event)
+        if handlers:
+            self.event_handlers[event] = [
+                entry for entry in handlers if entry[0] is not handler
+            ]
     
     def on_connect(self, callback: Callable) -> None:
         """Register a callback for connection events."""
-        self.on_connect_callbacks.append(callback)
-    
+        self.on_connect_callbacks.append(
+            (callback, asyncio.iscoroutinefunction(callback))
+        )
+
     def on_disconnect(self, callback: Callable) -> None:
         """Register a callback for disconnection events."""
-        self.on_disconnect_callbacks.append(callback)
+        self.on_disconnect_callbacks.append(
+            (callback, asyncio.iscoroutinefunction(callback))
+        )
+
+    async def _run_callbacks(self, callbacks: List[tuple], label: str) -> None:
+        """Run lifecycle callbacks: sync inline, coroutines concurrently.
+
+        Gathering the async callbacks makes connection setup cost the
+        slowest callback instead of the sum of all of them; one failure
+        is logged without aborting the rest.
+        """
+        coros = []
+        for callback, is_coro in callbacks:
+            if is_coro:
+                coros.append(callback())
+            else:
+                try:
+                    callback()
+                except Exception as e:
+                    logger.error(f"Error in {label} callback: {e}")
+
+        if coros:
+            for result in await asyncio.gather(*coros, return_exceptions=True):
+                if isinstance(result, Exception):
+                    logger.error(f"Error in {label} callback: {result}")
     
+    async def _send_frames(self) -> None:
+        """Drain the send queue, batching frames queued back-to-back.
+
+        A burst of commands (pipeline, search fan-out, parallel tool
+        calls) becomes one {"type":"batch","items":[...]} frame instead
+        of N small frames, amortizing the per-frame websocket and TCP
+        overhead. A lone command goes out unwrapped, so a gateway
+        without batch support only needs it for concurrent bursts.
+        """
+        queue = self._send_queue
+        while True:
+            frames = [await queue.get()]
+            while len(frames) < 32:
+                try:
+                    frames.append(queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+
+            try:
+                if len(frames) == 1:
+                    await self.websocket.send(frames[0])
+                else:
+                    await self.websocket.send(
+                        b'{"type":"batch","items":[' + b",".join(frames) + b"]}"
+                    )
+            except Exception as e:
+                # Fail the dropped commands right away instead of making
+                # their callers sit out the full timeout (up to minutes
+                # for sendMedia); the receive loop handles reconnection
+                logger.error(f"Error sending frames: {e}")
+                self._fail_frames(frames, e)
+
+    def _fail_frames(self, frames: List[bytes], error: Exception) -> None:
+        """Fail the pending futures for frames that never hit the wire.
+
+        The command id is recovered by re-parsing each payload — fine on
+        this cold path. Fire-and-forget frames have no pending future and
+        fall through the pop.
+        """
+        exc = ConnectionError(f"Failed to send command: {error}")
+        for frame in frames:
+            try:
+                command_id = orjson.loads(frame)["id"]
+            except (orjson.JSONDecodeError, KeyError):
+                continue
+            future = self.pending_commands.pop(command_id, None)
+            if future is not None and not future.done():
+                future.set_exception(exc)
+
+    def _discard_pending(self, future: asyncio.Future) -> None:
+        """Drop a settled command from the pending map (done callback)."""
+        self.pending_commands.pop(future._cmd_id, None)
+
+    async def _reap_timeouts(self) -> None:
+        """Fail pending commands whose deadline has passed.
+
+        One task sleeping until the nearest deadline replaces the
+        per-command timer that wait_for would push onto the loop's
+        schedule heap. Entries for commands that already completed are
+        simply skipped when they surface (lazy deletion).
+        """
+        deadlines = self._deadlines
+        pending = self.pending_commands
+        time = self._loop.time
+        while True:
+            if not deadlines:
+                await asyncio.sleep(1)
+                continue
+
+            when, command_id, command = deadlines[0]
+            delay = when - time()
+            if delay > 0:
+                # Capped nap so a shorter deadline pushed while we sleep
+                # is at most a second late, without needing a wakeup event
+                await asyncio.sleep(min(delay, 1))
+                continue
+
+            heapq.heappop(deadlines)
+            future = pending.get(command_id)
+            if future is not None and not future.done():
+                msg = self._timeout_msgs.get(command)
+                if msg is None:
+                    msg = self._timeout_msgs[command] = f"Command {command} timed out"
+                future.set_exception(TimeoutError(msg))
+
+    def _on_response(self, data: Dict[str, Any]) -> None:
+        """Resolve the pending future for a command response.
+
+        The id field is always present in well-formed frames, so the
+        subscript + KeyError shape beats .get with a sentinel check.
+        """
+        try:
+            future = self.pending_commands.pop(data["id"])
+        except KeyError:
+            return
+        if not future.done():
+            future.set_result(data)
+
+    def _on_error(self, data: Dict[str, Any]) -> None:
+        """Fail the pending future for a command error."""
+        try:
+            future = self.pending_commands.pop(data["id"])
+        except KeyError:
+            return
+        if not future.done():
+            future.set_exception(Exception(data.get("error", "Unknown error")))
+
+    def _on_event(self, data: Dict[str, Any]) -> None:
+        """Track auth state and hand the event to registered handlers."""
+        event_type = data.get("event")
+        if not event_type:
+            return
+
+        if event_type == "authenticated":
+            self.authenticated = True
+        elif event_type == "disconnected":
+            self.authenticated = False
+
+        self._dispatch_event(event_type, data)
+
     async def _receive_messages(self) -> None:
         """Receive messages from the WebSocket connection."""
         if not self.websocket:
             return
-        
+
+        # Hoist the hot lookups out of the per-frame loop
+        loads = orjson.loads
+        dispatch_get = self._msg_dispatch.get
+
         try:
             async for message in self.websocket:
                 try:
-                    # Parse message
-                    data = json.loads(message)
-                    message_type = data.get("type")
-                    
-                    if message_type == "response":
-                        # Handle command response
-                        command_id = data.get("id")
-                        if command_id in self.pending_commands:
-                            future = self.pending_commands.pop(command_id)
-                            if not future.done():
-                                future.set_result(data)
-                    
-                    elif message_type == "error":
-                        # Handle command error
-                        command_id = data.get("id")
-                        if command_id in self.pending_commands:
-                            future = self.pending_commands.pop(command_id)
-                            if not future.done():
-                                future.set_exception(Exception(data.get("error", "Unknown error")))
-                    
-                    elif message_type == "event":
-                        # Handle events
-                        event_type = data.get("event")
-                        if event_type:
-                            # Update authentication status
-                            if event_type == "authenticated":
-                                self.authenticated = True
-                            elif event_type == "disconnected":
-                                self.authenticated = False
-                            
-                            # Call event handlers
-                            await self._dispatch_event(event_type, data)
-                except json.JSONDecodeError:
+                    # Parse message; orjson takes str or bytes frames
+                    # directly, with no intermediate encode
+                    data = loads(message)
+                    handler = dispatch_get(data.get("type"))
+                    if handler is not None:
+                        handler(data)
+                except orjson.JSONDecodeError:
                     logger.error(f"Failed to parse message: {message}")
                 except Exception as e:
                     logger.error(f"Error processing message: {e}")
@@ -240,50 +548,89 @@ class WhatsAppGatewayClient:
             logger.warning("WebSocket connection closed")
             self.connected = False
             
-            # Reject pending commands
-            for command_id, future in self.pending_commands.items():
+            # Reject pending commands in one pass: popitem consumes the
+            # dict in place instead of iterating and then clearing, and
+            # one exception instance serves every future
+            exc = ConnectionError("Connection closed")
+            pending = self.pending_commands
+            while pending:
+                _, future = pending.popitem()
                 if not future.done():
-                    future.set_exception(ConnectionError("Connection closed"))
-            self.pending_commands.clear()
+                    future.set_exception(exc)
             
-            # Start reconnection task if not already running
-            if not self.reconnect_task or self.reconnect_task.done():
-                self.reconnect_task = asyncio.create_task(self._reconnect())
-                self.tasks.add(self.reconnect_task)
-                self.reconnect_task.add_done_callback(self.tasks.discard)
+            # Hand recovery to the supervisor
+            self.ensure_supervisor()
         except Exception as e:
             logger.error(f"Error in message receiver: {e}")
             self.connected = False
-    
-    async def _reconnect(self) -> None:
-        """Reconnect to the WhatsApp Gateway."""
-        attempt = 0
-        
-        while attempt < self.max_reconnect_attempts and not self.connected:
-            attempt += 1
-            logger.info(f"Reconnecting to WhatsApp Gateway (attempt {attempt}/{self.max_reconnect_attempts})")
-            
+
+    def ensure_supervisor(self) -> None:
+        """Start the reconnect supervisor if it is not already running."""
+        if self._closed:
+            return
+        if not self.reconnect_task or self.reconnect_task.done():
+            self.reconnect_task = self._spawn(self._supervisor())
+
+    async def _supervisor(self) -> None:
+        """Keep the gateway connection alive for the life of the client.
+
+        One persistent task replaces the bounded fixed-interval retry
+        loop: while the connection is healthy the websocket ping/pong
+        keepalive detects drops, and while the gateway is unreachable the
+        retry delay backs off exponentially (1s doubling up to 60s)
+        instead of hammering it every reconnect_interval and giving up
+        after max_reconnect_attempts.
+        """
+        backoff = 1
+        while not self._closed:
+            if self.connected:
+                backoff = 1
+                await asyncio.sleep(1)
+                continue
+
             try:
-                await asyncio.sleep(self.reconnect_interval)
-                await self.connect()
-                
-                if self.connected:
-                    logger.info(f"Reconnected to WhatsApp Gateway after {attempt} attempts")
-                    return
+                if await self.connect():
+                    logger.info("Supervisor reconnected to WhatsApp Gateway")
+                    continue
             except Exception as e:
-                logger.error(f"Reconnection attempt {attempt} failed: {e}")
-        
-        if not self.connected:
-            logger.error(f"Failed to reconnect after {self.max_reconnect_attempts} attempts")
+                logger.error(f"Supervisor reconnect attempt failed: {e}")
+
+            # Jitter the delay so clients that lost the gateway together
+            # don't all reconnect in lockstep when it comes back
+            delay = random.uniform(0.5 * backoff, 1.5 * backoff)
+            logger.info(f"Gateway unreachable, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            backoff = min(60, backoff * 2)
     
-    async def _dispatch_event(self, event_type: str, data: Dict[str, Any]) -> None:
-        """Dispatch an event to registered handlers."""
-        if event_type in self.event_handlers:
-            for handler in self.event_handlers[event_type]:
-                try:
-                    if asyncio.iscoroutinefunction(handler):
-                        await handler(data)
-                    else:
-                        handler(data)
-                except Exception as e:
-                    logger.error(f"Error in event handler for {event_type}: {e}")
\ No newline at end of file
+    def _dispatch_event(self, event_type: str, data: Dict[str, Any]) -> None:
+        """Schedule registered handlers without blocking the receive loop.
+
+        Sync handlers run on the next loop iteration via call_soon and
+        coroutine handlers run as tasks, so the receive coroutine goes
+        straight back to the socket instead of awaiting handler work
+        between frames.
+        """
+        handlers = self.event_handlers.get(event_type)
+        if not handlers:
+            return
+
+        call_soon = self._loop.call_soon
+        for handler, is_coro in handlers:
+            if is_coro:
+                self._spawn(self._guarded(handler, data, event_type))
+            else:
+                call_soon(self._safe_call, handler, data, event_type)
+
+    def _safe_call(self, handler: Callable, data: Dict[str, Any], event_type: str) -> None:
+        """Run a sync handler, logging instead of raising on failure."""
+        try:
+            handler(data)
+        except Exception as e:
+            logger.error(f"Error in event handler for {event_type}: {e}")
+
+    async def _guarded(self, handler: Callable, data: Dict[str, Any], event_type: str) -> None:
+        """Await an async handler, logging instead of raising on failure."""
+        try:
+            await handler(data)
+        except Exception as e:
+            logger.error(f"Error in event handler for {event_type}: {e}")
\ No newline at end of file
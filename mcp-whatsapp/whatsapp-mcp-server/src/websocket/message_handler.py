@@ -6,6 +6,7 @@ Message handler for WebSocket messages.
 
 import json
 import asyncio
+from functools import lru_cache
 from typing import Dict, Any, Callable, Awaitable
 from ..utils.logger import logger
 from .client import WhatsAppGatewayClient
@@ -31,25 +32,33 @@ class WebSocketMessageHandler:
     
     async def handle_message(self, message: Dict[str, Any]) -> Dict[str, Any]:
         """Handle a message from Claude Desktop."""
+        # One probe per dict on the fast path: subscript and let
+        # KeyError cover both the missing field and the unknown command
         try:
-            # Validate message format
-            if "command" not in message:
-                return self._create_error_response("Missing command field")
-            
-            command = message.get("command")
-            
-            # Check if command is registered
-            if command not in self.command_handlers:
-                return self._create_error_response(f"Unknown command: {command}")
-            
-            # Call command handler
-            return await self.command_handlers[command](message)
+            command = message["command"]
+        except KeyError:
+            return self._create_error_response("Missing command field")
+
+        try:
+            handler = self.command_handlers[command]
+        except KeyError:
+            return self._create_error_response(f"Unknown command: {command}")
+
+        try:
+            return await handler(message)
         except Exception as e:
             logger.exception(f"Error handling message: {e}")
             return self._create_error_response(f"Error processing command: {str(e)}")
     
-    def _create_error_response(self, error_message: str) -> Dict[str, Any]:
-        """Create an error response."""
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def _create_error_response(error_message: str) -> Dict[str, Any]:
+        """Create an error response.
+
+        Memoized: the handful of error strings repeat constantly, and
+        callers only serialize the response, so handing back the same
+        (never mutated) dict skips an allocation per error.
+        """
         return {
             "success": False,
             "error": error_message,
@@ -81,8 +90,14 @@ class WebSocketMessageHandler:
     
     async def _handle_message_event(self, data: Dict[str, Any]) -> None:
         """Handle message event."""
-        message = data.get("message", {})
-        logger.debug(f"Received WhatsApp message: {message.get('id')}")
+        # Subscript with KeyError instead of chained .get defaults: the
+        # fields are present in well-formed events, and this runs for
+        # every inbound message
+        try:
+            msg_id = data["message"]["id"]
+        except KeyError:
+            msg_id = None
+        logger.debug(f"Received WhatsApp message: {msg_id}")
         # This event will be forwarded to Claude Desktop by the MCP handler
     
     async def _handle_disconnected_event(self, data: Dict[str, Any]) -> None: